@@ -0,0 +1,30 @@
+"""
+QuinticHermiteSegment construction, evaluation and sampling.
+"""
+import numpy as np
+from spline_toolkit import QuinticHermiteSegment
+
+from .common import DIMS, random_controls
+
+
+class SegmentSuite:
+    params = [DIMS]
+    param_names = ["dim"]
+
+    def setup(self, dim):
+        self.controls = [c[:2] for c in random_controls(2, dim)]
+        self.segment = QuinticHermiteSegment(*self.controls)
+        self.t = np.linspace(0, 1, 10000)
+
+    def time_init(self, dim):
+        QuinticHermiteSegment(*self.controls)
+
+    def time_evaluate_scalar(self, dim):
+        self.segment.evaluate(0.37)
+
+    def time_evaluate_array(self, dim):
+        self.segment.evaluate(self.t)
+
+    def time_sample(self, dim):
+        self.segment.sample_cache.clear()
+        self.segment.sample()
@@ -0,0 +1,79 @@
+"""
+QuinticHermiteSpline construction, evaluation, sampling and editing, from 1 to 10^5 segments.
+"""
+import numpy as np
+from spline_toolkit import QuinticHermiteSpline
+
+from .common import DIMS, SEGMENT_COUNTS, random_controls
+
+
+class SplineSuite:
+    params = [SEGMENT_COUNTS, DIMS]
+    param_names = ["n_segments", "dim"]
+
+    def setup(self, n_segments, dim):
+        self.controls = random_controls(n_segments + 1, dim)
+        self.spline = QuinticHermiteSpline.from_controls(*self.controls)
+        self.spline.coefficients
+        self.s = np.linspace(0, n_segments, 100000)
+
+    def time_from_controls(self, n_segments, dim):
+        QuinticHermiteSpline.from_controls(*self.controls).coefficients
+
+    def time_evaluate(self, n_segments, dim):
+        self.spline.evaluate(self.s)
+
+    def time_evaluate_all(self, n_segments, dim):
+        self.spline.evaluate_all(self.s)
+
+
+class SplineFreshSuite:
+    """
+    Sampling and editing fill caches or change the spline, so every timed call
+    gets a freshly built spline with its coefficients already computed.
+    """
+    params = [SEGMENT_COUNTS, DIMS]
+    param_names = ["n_segments", "dim"]
+    number = 1
+    repeat = 5
+
+    def setup(self, n_segments, dim):
+        self.spline = QuinticHermiteSpline.from_controls(*random_controls(n_segments + 1, dim))
+        self.spline.coefficients
+        self.knot = np.ones((3, dim))
+
+    def time_sample(self, n_segments, dim):
+        self.spline.sample()
+
+    def time_sample_n_points(self, n_segments, dim):
+        self.spline.sample(n_points=20 * n_segments)
+
+    def time_length(self, n_segments, dim):
+        self.spline.length()
+
+    def time_add_point_append(self, n_segments, dim):
+        self.spline.add_point(*self.knot)
+        self.spline.coefficients
+
+    def time_add_point_insert(self, n_segments, dim):
+        self.spline.add_point(*self.knot, index=n_segments // 2 or None)
+        self.spline.coefficients
+
+
+class SplineResampleSuite:
+    """
+    Incremental re-tessellation: one knot moves after a full sample.
+    """
+    params = [SEGMENT_COUNTS, DIMS]
+    param_names = ["n_segments", "dim"]
+    number = 1
+    repeat = 5
+
+    def setup(self, n_segments, dim):
+        self.spline = QuinticHermiteSpline.from_controls(*random_controls(n_segments + 1, dim))
+        self.spline.sample(n_points=20 * n_segments)
+        self.point = np.ones((1, dim))
+
+    def time_update_controls_resample(self, n_segments, dim):
+        self.spline.update_controls([n_segments // 2], points=self.point)
+        self.spline.sample(n_points=20 * n_segments)
@@ -0,0 +1,16 @@
+"""
+Shared inputs for the benchmark suites.
+"""
+import numpy as np
+
+SEGMENT_COUNTS = [1, 10, 100, 1000, 10000, 100000]
+DIMS = [1, 2, 3]
+
+
+def random_controls(n_knots, dim, seed=0):
+    """
+    Reproducible (points, tangents, curvatures) arrays of shape (n_knots, dim).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.cumsum(rng.normal(size=(n_knots, dim)), axis=0)
+    return points, rng.normal(size=(n_knots, dim)), rng.normal(size=(n_knots, dim))
@@ -0,0 +1,147 @@
+"""
+Minimal runner for the asv-style suites in this package, with stored baselines.
+
+    python -m benchmarks.run                                  # run everything, print timings
+    python -m benchmarks.run -k "n_segments=1000\\b"          # only matching benchmarks
+    python -m benchmarks.run --save benchmarks/baselines/mine.json
+    python -m benchmarks.run --compare benchmarks/baselines/mine.json --threshold 1.2
+
+--compare exits with status 1 if any benchmark is slower than threshold x its baseline.
+The suites follow asv conventions (params, param_names, setup, time_*, number, repeat),
+so `asv run` / `asv continuous` work on them as well.
+"""
+import argparse
+import importlib
+import itertools
+import json
+import pkgutil
+import platform
+import re
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_REPEAT = 3
+
+
+def _suites():
+    """
+    Yield (name, class) for every benchmark class in the bench_* modules of this package.
+    """
+    package = Path(__file__).parent
+    for info in sorted(pkgutil.iter_modules([str(package)]), key=lambda m: m.name):
+        if not info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{__package__}.{info.name}")
+        for name, obj in sorted(vars(module).items()):
+            if isinstance(obj, type) and obj.__module__ == module.__name__ and \
+                    any(attr.startswith("time_") for attr in dir(obj)):
+                yield f"{info.name}.{name}", obj
+
+
+def _benchmarks():
+    """
+    Yield (key, class, method name, params) for every benchmark and parameter combination.
+    """
+    for suite_name, suite in _suites():
+        params = getattr(suite, "params", [])
+        names = getattr(suite, "param_names", [])
+        for method in sorted(attr for attr in dir(suite) if attr.startswith("time_")):
+            for combo in itertools.product(*params):
+                label = ", ".join(f"{n}={v}" for n, v in zip(names, combo))
+                yield f"{suite_name}.{method}({label})", suite, method, combo
+
+
+def _time(suite, method, combo, quick=False):
+    """
+    Best time per call in seconds. Suites that set `number` get a fresh setup before every repeat;
+    otherwise the number of calls per repeat is chosen with timeit's autorange.
+    """
+    repeat = 1 if quick else getattr(suite, "repeat", DEFAULT_REPEAT)
+    number = 1 if quick else getattr(suite, "number", None)
+    fresh = hasattr(suite, "number")
+    times = []
+    for i in range(repeat):
+        if i == 0 or fresh:
+            bench = suite()
+            if hasattr(bench, "setup"):
+                bench.setup(*combo)
+            call = getattr(bench, method)
+        timer = timeit.Timer(lambda: call(*combo))
+        if number is None:
+            number = timer.autorange()[0]
+        times.append(timer.timeit(number) / number)
+    return min(times)
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.3f} {unit}"
+    return f"{seconds / 1e-9:8.3f} ns"
+
+
+def run(pattern=None, quick=False):
+    """
+    Run the matching benchmarks, printing each result. Returns {key: seconds}.
+    """
+    results = {}
+    for key, suite, method, combo in _benchmarks():
+        if pattern and not re.search(pattern, key):
+            continue
+        results[key] = _time(suite, method, combo, quick=quick)
+        print(f"{_format(results[key])}  {key}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of every result to its baseline. Returns the keys that regressed.
+    """
+    regressed = []
+    for key, seconds in results.items():
+        if key not in baseline:
+            continue
+        ratio = seconds / baseline[key]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressed.append(key)
+        elif ratio < 1 / threshold:
+            flag = "  improved"
+        print(f"{ratio:7.2f}x  {_format(baseline[key])} -> {_format(seconds)}  {key}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose key matches this regex")
+    parser.add_argument("--quick", action="store_true", help="one call per benchmark, for smoke testing")
+    parser.add_argument("--save", metavar="FILE", help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default: 1.2)")
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern, quick=args.quick)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "numpy": np.__version__,
+                            "platform": platform.platform(), "processor": platform.processor()},
+                "results": results,
+            }, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"{len(regressed)} benchmark(s) regressed by more than {args.threshold}x.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
-import math
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from spline_toolkit import QuinticHermiteSpline, QuinticHermiteSegment
+from spline_toolkit import SplineBatch
 
 # Fixed control data
 p0 = np.array([0.0, 0.0])
@@ -10,6 +9,21 @@ p1 = np.array([1.0, 0.0])
 c0 = np.array([0.0, 0.0])
 c1 = np.array([0.0, 0.0])
 
+# Sweep leading and trailing tangent angles over all frames at once
+n_frames = 100
+frames = np.arange(n_frames)
+angle0 = np.radians(0 - 120 * np.sin(frames * 0.1))
+angle1 = np.radians(180 - 90 * np.sin(frames * 0.1))
+t0 = np.stack([np.cos(angle0), np.sin(angle0)], axis=-1)
+t1 = np.stack([np.cos(angle1), np.sin(angle1)], axis=-1)
+
+batch = SplineBatch.from_controls(
+    np.broadcast_to([p0, p1], (n_frames, 2, 2)),
+    np.stack([t0, t1], axis=1),
+    np.broadcast_to([c0, c1], (n_frames, 2, 2))
+)
+samples = batch.sample()
+
 # Create figure
 fig, ax = plt.subplots(figsize=(10, 6))
 line, = ax.plot([], [], 'b-', label='Spline')
@@ -26,32 +40,20 @@ def init():
     return line, arrow1, arrow2, point_plot
 
 def update(frame):
-    # Sweep trailing tangent angle and curvature
-    angle0 = 0 - 120 * np.sin(frame * 0.1)
-    angle1 = 180 - 90 * np.sin(frame * 0.1)
-    t0 = np.array([np.cos(math.radians(angle0)), np.sin(math.radians(angle0))])
-    t1 = np.array([np.cos(math.radians(angle1)), np.sin(math.radians(angle1))])
-
-    segment = QuinticHermiteSegment(
-        [p0, p1],
-        [t0, t1],
-        [c0, c1]
-    )
-    spline = QuinticHermiteSpline.from_segments(segment)
-    points = spline.sample()
+    points = samples[frame]
     x_vals, y_vals = points[:, 0], points[:, 1]
 
     line.set_data(x_vals, y_vals)
 
     # Update quivers
     arrow1.set_offsets(p0)
-    arrow1.set_UVC(t0[0], t0[1])
+    arrow1.set_UVC(t0[frame, 0], t0[frame, 1])
     arrow2.set_offsets(p1)
-    arrow2.set_UVC(t1[0], t1[1])
+    arrow2.set_UVC(t1[frame, 0], t1[frame, 1])
 
     return line, arrow1, arrow2, point_plot
 
-ani = FuncAnimation(fig, update, frames=100, init_func=init, blit=True, interval=50)
+ani = FuncAnimation(fig, update, frames=n_frames, init_func=init, blit=True, interval=50)
 plt.title('Animated Quintic Hermite Spline - Tangency sweep')
 plt.xlabel('x')
 plt.ylabel('y')
@@ -10,7 +10,7 @@ setup(
     author='Sean Auer',
     author_email='sean@seanauer.com',
     url='https://github.com/SeanAuer/spline_toolkit',
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=requirements,
     classifiers=[
         'Programming Language :: Python :: 3',
@@ -1,2 +1,8 @@
-from .quintic_hermite_segment import QuinticHermiteSegment
-from .quintic_hermite_spline import QuinticHermiteSpline
\ No newline at end of file
+from .quintic_hermite_segment import QuinticHermiteSegment, hermite_coefficients
+from .quintic_hermite_spline import QuinticHermiteSpline
+from .spline_batch import SplineBatch
+from .parallel import ParallelExecutor, parallel
+from .library import SplineLibrary
+from .profiling import profile
+from .fitting import fit_spline
+from .quintic_hermite_surface import QuinticHermiteSurface
@@ -0,0 +1,231 @@
+"""
+Arc-length tables for runs of quintic Hermite segments.
+
+Each segment is split into sub-intervals whose lengths are integrated once with Gauss-Legendre
+quadrature. Every pair of neighbouring sub-intervals is checked against one quadrature over
+both, and pairs that disagree by more than the tolerance are bisected until they agree, so only
+segments whose speed is hard to integrate get finer tables. A 1D curve is instead split where
+it turns back, since between turning points its length is just the change in its value.
+Lengths at arbitrary parameters are then a table lookup plus one short quadrature, and the
+inverse map is found with a safeguarded Newton iteration.
+"""
+import numpy as np
+from .monotone import MonotonePieces
+from .polynomial import derivative_coefficients, horner, power_basis
+from .profiling import instrumented
+
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(8)
+
+# Bisections allowed below the initial sub-intervals; 2**-40 is near double-precision spacing.
+_MAX_DEPTH = 40
+
+# Relative rounding error of a quadrature sum, below which two estimates count as equal.
+_ROUNDING = 16 * np.finfo(float).eps
+
+
+class ArcLengthTable:
+    """
+    Cumulative arc length of a sequence of segments laid end to end.
+
+    Segment lengths are accurate to about `rtol` relative to each segment. In 2D and 3D the
+    speed has a kink at a cusp, where the velocity vanishes, and a cusp lying close to a
+    sub-interval end can pass the bisection test with a larger error.
+
+    The sub-intervals of all segments are stored back to back: segment i has `counts[i]` of
+    them, whose start parameters and lengths from the segment start are `breaks[j]` and
+    `cumulative[j]` for j in starts[i] .. starts[i] + counts[i].
+    """
+    @instrumented("arc_length.table")
+    def __init__(self, coefficients, subintervals=16, rtol=1e-12):
+        """
+        :param coefficients: array of shape (N, dim, 6)
+        :param subintervals: initial number of quadrature sub-intervals per segment
+        :param rtol: target quadrature error of each segment length, relative to that length
+        """
+        coefficients = np.asarray(coefficients, dtype=float)
+        self._velocity = derivative_coefficients(coefficients, 1)
+        n = len(coefficients)
+        if coefficients.shape[1] == 1:
+            pieces = MonotonePieces(coefficients)
+            seg, a, lengths = pieces.segments, pieces.lo, np.abs(pieces.f_hi - pieces.f_lo)
+        else:
+            seg, a, lengths = self._adaptive_pieces(subintervals, rtol)
+
+        self.counts = np.bincount(seg, minlength=n)
+        self.starts = np.concatenate([[0], np.cumsum(self.counts + 1)[:-1]]).astype(np.intp)
+        self.breaks = np.ones(len(seg) + n)
+        self.breaks[np.arange(len(seg)) + seg] = a
+        # Sum each segment's pieces on its own, in groups of segments with equal counts.
+        self.cumulative = np.zeros(len(seg) + n)
+        first = np.cumsum(self.counts) - self.counts
+        for count in np.unique(self.counts):
+            rows = np.flatnonzero(self.counts == count)
+            steps = np.arange(count)
+            self.cumulative[self.starts[rows, None] + 1 + steps] = \
+                np.cumsum(lengths[first[rows, None] + steps], axis=1)
+        self.segment_lengths = self.cumulative[self.starts + self.counts]
+        self.offsets = np.concatenate([[0.0], np.cumsum(self.segment_lengths)])
+        # The same table measured from the start of the run, for searching by global length.
+        self._running = self.cumulative + np.repeat(self.offsets[:-1], self.counts + 1)
+
+    def _adaptive_pieces(self, subintervals, rtol):
+        """
+        Sub-intervals on which quadrature meets rtol, ordered by segment then parameter.
+        Returns: (segment indices, start parameters, lengths)
+        """
+        n = len(self._velocity)
+        # Every cell of an m-cell grid is compared with its two halves, which become the table.
+        m = max(subintervals // 2, 1)
+        whole = self._uniform(m)
+        halves = self._uniform(2 * m)
+        left, right = halves[:, 0::2], halves[:, 1::2]
+        # Error allowed per unit of parameter, so that a segment's pieces sum to rtol.
+        budget = rtol * halves.sum(axis=1)
+        failed = np.abs(whole - left - right) > budget[:, None] / m + _ROUNDING * (left + right)
+        refined = failed.any(axis=1)
+        plain = np.flatnonzero(~refined)
+        pieces = [(np.repeat(plain, 2 * m), np.tile(np.arange(2 * m) / (2 * m), len(plain)), halves[plain].ravel())]
+        if not len(plain) < n:
+            return pieces[0]
+
+        rows, cells = np.nonzero(~failed & refined[:, None])
+        pieces += [(rows, cells / m, left[rows, cells]), (rows, (cells + 0.5) / m, right[rows, cells])]
+        rows, cells = np.nonzero(failed)
+        seg = np.concatenate([rows, rows])
+        a = np.concatenate([cells / m, (cells + 0.5) / m])
+        width = np.full(len(seg), 0.5 / m)
+        whole = np.concatenate([left[rows, cells], right[rows, cells]])
+        for depth in range(_MAX_DEPTH):
+            half = width / 2
+            left_half = self._integrate(seg, a, half)
+            right_half = self._integrate(seg, a + half, half)
+            done = np.abs(whole - left_half - right_half) <= budget[seg] * width + _ROUNDING * (left_half + right_half)
+            if depth == _MAX_DEPTH - 1:
+                done[:] = True
+            pieces.append((seg[done], a[done], left_half[done]))
+            pieces.append((seg[done], (a + half)[done], right_half[done]))
+            seg, a, half = seg[~done], a[~done], half[~done]
+            if len(seg) == 0:
+                break
+            seg = np.concatenate([seg, seg])
+            a = np.concatenate([a, a + half])
+            width = np.concatenate([half, half])
+            whole = np.concatenate([left_half[~done], right_half[~done]])
+        seg, a, lengths = (np.concatenate(column) for column in zip(*pieces))
+        order = np.lexsort((a, seg))
+        return seg[order], a[order], lengths[order]
+
+    def _uniform(self, count):
+        """
+        Lengths of `count` equal sub-intervals of every segment, shape (N, count).
+        """
+        nodes = np.arange(count)[:, None] / count + (_GL_NODES + 1) / (2 * count)
+        d1 = self._velocity @ power_basis(nodes.ravel(), m=5).T
+        speed = np.linalg.norm(d1, axis=-2).reshape(len(d1), count, len(_GL_NODES))
+        return speed @ _GL_WEIGHTS / (2 * count)
+
+    def _integrate(self, seg, a, width):
+        """
+        Lengths of segments seg over the parameter intervals [a, a + width].
+        """
+        nodes = a[:, None] + width[:, None] * (_GL_NODES + 1) / 2
+        return width / 2 * (self.speed(seg[:, None], nodes) @ _GL_WEIGHTS)
+
+    def _interval(self, idx, t):
+        """
+        Index into `breaks` of the sub-interval of segment idx containing local parameter t.
+        """
+        lo = self.starts[idx]
+        hi = lo + self.counts[idx]
+        # Binary search within each segment's own breaks.
+        for _ in range(int(self.counts.max(initial=1)).bit_length()):
+            mid = (lo + hi) // 2
+            right = self.breaks[mid] <= t
+            lo = np.where(right, mid, lo)
+            hi = np.where(right, hi, mid)
+        return lo
+
+    @property
+    def total(self):
+        return self.offsets[-1]
+
+    def speed(self, idx, t):
+        """
+        Speed ||x'(t)|| of segments idx at local parameters t.
+        """
+        return np.linalg.norm(horner(self._velocity, t, index=idx), axis=-1)
+
+    def local_length(self, idx, t):
+        """
+        Arc length from the start of segment idx to local parameter t (clipped to [0, 1]).
+        """
+        idx = np.asarray(idx)
+        t = np.clip(np.asarray(t, dtype=float), 0.0, 1.0)
+        idx, t = np.broadcast_arrays(idx, t)
+        return self._length_in(idx, self._interval(idx, t), t)
+
+    def _length_in(self, idx, j, t):
+        """
+        local_length for parameters t known to lie in sub-interval j of segment idx.
+        """
+        a = self.breaks[j]
+        half = (t - a) / 2
+        nodes = a[..., None] + half[..., None] * (_GL_NODES + 1)
+        speed = self.speed(idx[..., None], nodes)
+        return self.cumulative[j] + half * (speed @ _GL_WEIGHTS)
+
+    def length_at(self, idx, t):
+        """
+        Arc length from the start of the first segment to local parameter t on segment idx.
+        """
+        return self.offsets[idx] + self.local_length(idx, t)
+
+    def locate(self, lengths, first=0, last=None, tol=1e-12, max_iter=50):
+        """
+        Invert the table: find (segment index, local parameter) for each arc length.
+        :param lengths: arc lengths measured from the start of the run
+        :param first: index of the first segment each length may fall on (scalar or array)
+        :param last: index of the last segment each length may fall on (default: the last one)
+        Lengths outside the allowed segments are clipped to their ends.
+        """
+        last = len(self.segment_lengths) - 1 if last is None else last
+        lengths, first, last = np.broadcast_arrays(np.asarray(lengths, dtype=float), first, last)
+        shape = lengths.shape
+        lengths, first, last = lengths.ravel(), first.ravel(), last.ravel()
+        lengths = np.clip(lengths, self.offsets[first], self.offsets[last + 1])
+        idx = np.clip(np.searchsorted(self.offsets, lengths, side='right') - 1, first, last)
+        target = lengths - self.offsets[idx]
+
+        # Bracket each target inside one sub-interval and start from linear interpolation.
+        starts = self.starts[idx]
+        j = np.searchsorted(self._running, lengths, side='right') - 1
+        j = np.clip(j, starts, starts + self.counts[idx] - 1)
+        c0 = self.cumulative[j]
+        c1 = self.cumulative[j + 1]
+        span = c1 - c0
+        frac = np.divide(target - c0, span, out=np.zeros_like(span), where=span > 0)
+        lo = self.breaks[j]
+        hi = self.breaks[j + 1]
+        t = lo + np.clip(frac, 0.0, 1.0) * (hi - lo)
+
+        # Tolerance relative to each run, plus the rounding error of the global offsets.
+        atol = tol * np.maximum(self.offsets[last + 1] - self.offsets[first], 1.0)
+        atol += 4 * np.finfo(float).eps * self.offsets[last + 1]
+        active = np.arange(len(t))
+        for _ in range(max_iter):
+            ta, ia = t[active], idx[active]
+            f = self._length_in(ia, j[active], ta) - target[active]
+            lo_a = np.where(f < 0, ta, lo[active])
+            hi_a = np.where(f > 0, ta, hi[active])
+            speed = self.speed(ia, ta)
+            step = np.divide(f, speed, out=np.full_like(f, np.inf), where=speed > 0)
+            newton = ta - step
+            # Fall back to bisection whenever Newton leaves the bracket.
+            inside = (newton > lo_a) & (newton < hi_a)
+            done = (np.abs(f) <= atol[active]) | (hi_a - lo_a <= 4 * np.finfo(float).eps)
+            t[active] = np.where(done, ta, np.where(inside, newton, (lo_a + hi_a) / 2))
+            lo[active], hi[active] = lo_a, hi_a
+            active = active[~done]
+            if len(active) == 0:
+                break
+        return idx.reshape(shape), t.reshape(shape)
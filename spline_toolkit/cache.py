@@ -0,0 +1,132 @@
+"""
+Version stamps and bounded LRU caches for sampled geometry.
+
+Every change to a segment or spline takes a fresh stamp from a single process-wide
+counter, so a (version, mode, n_points) key can never match data sampled from
+different geometry, and a segment's stamp identifies its geometry even after
+knots are inserted before it.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 8
+
+_version_lock = threading.Lock()
+_last_version = 0
+
+
+def next_version(n=None):
+    """
+    Take a fresh version stamp, or an array of n consecutive fresh stamps.
+    """
+    global _last_version
+    with _version_lock:
+        first = _last_version + 1
+        _last_version += 1 if n is None else n
+    return first if n is None else np.arange(first, first + n, dtype=np.int64)
+
+
+class SampleCache:
+    """
+    Least-recently-used cache of sampled point arrays with hit/miss statistics.
+    """
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, max_bytes=None):
+        """
+        :param maxsize: maximum number of cached arrays (0 disables caching)
+        :param max_bytes: optional bound on the total size of cached arrays, in bytes
+        """
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        self._maxsize = maxsize
+        self._evict()
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """
+        Return the cached read-only array for key, or None on a miss.
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store value under key, evicting least-recently-used entries as needed.
+        The array is kept without copying and made read-only, so the caller must pass
+        an array it owns and not write to it afterwards.
+        """
+        if self._maxsize == 0:
+            return
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        value = np.asarray(value)
+        value.flags.writeable = False
+        self._entries[key] = value
+        self.nbytes += value.nbytes
+        self._evict()
+
+    def _evict(self):
+        while self._entries and (
+                (self._maxsize is not None and len(self._entries) > self._maxsize) or
+                (self._max_bytes is not None and self.nbytes > self._max_bytes)):
+            _, value = self._entries.popitem(last=False)
+            self.nbytes -= value.nbytes
+            self.evictions += 1
+
+    def prune(self, version):
+        """
+        Drop every entry whose key was made for a version other than `version`.
+        Versions only ever increase, so such entries can never be hit again.
+        """
+        for key in [key for key in self._entries if key[0] != version]:
+            self.nbytes -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def info(self):
+        """
+        Cache statistics as a plain dict.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self._maxsize,
+            "nbytes": self.nbytes,
+            "max_bytes": self._max_bytes,
+        }
@@ -0,0 +1,176 @@
+"""
+Least-squares fitting of quintic Hermite splines to ordered point clouds.
+
+A point at local parameter t of segment i depends only on the (point, tangent, curvature)
+rows of knots i and i + 1, so the normal equations are block tridiagonal with one 3x3 block
+per knot, shared by every coordinate. They are assembled with per-segment bincounts and
+solved by block cyclic reduction: O(n_points + n_knots) work in O(log n_knots) array passes.
+"""
+import numpy as np
+from .polynomial import power_basis
+from .profiling import instrumented
+from .quintic_hermite_segment import _HERMITE_BASIS
+from .quintic_hermite_spline import QuinticHermiteSpline
+
+# Gram matrix of the second derivatives of the monomials on [0, 1]: the integral of
+# t^(k-2) t^(l-2) k (k - 1) l (l - 1). Mapped to knot values it gives the smoothing term.
+_K = np.arange(6)
+_SECOND = _K * (_K - 1)
+_GRAM2 = np.where((_K[:, None] >= 2) & (_K[None, :] >= 2),
+                  np.outer(_SECOND, _SECOND) / np.maximum(_K[:, None] + _K[None, :] - 3, 1), 0.0)
+_SMOOTHING = _HERMITE_BASIS.T @ _GRAM2 @ _HERMITE_BASIS
+
+# Points processed per block while assembling, bounding the size of temporary arrays.
+_BLOCK_POINTS = 1 << 20
+
+
+def solve_block_tridiagonal(lower, diag, upper, rhs):
+    """
+    Solve A_i x_{i-1} + B_i x_i + C_i x_{i+1} = d_i by block cyclic reduction.
+    Stable for symmetric positive definite systems such as normal equations.
+    :param lower: array of shape (K, b, b) of A_i (lower[0] is ignored)
+    :param diag: array of shape (K, b, b) of B_i
+    :param upper: array of shape (K, b, b) of C_i (upper[-1] is ignored)
+    :param rhs: array of shape (K, b, r)
+    Returns: array of shape (K, b, r)
+    """
+    if len(diag) == 1:
+        return np.linalg.solve(diag, rhs)
+    n_even = (len(diag) + 1) // 2
+
+    def shifted(x, front):
+        # x of the odd rows, aligned with the even rows on their left (front) or right side.
+        pad = np.zeros((1,) + x.shape[1:])
+        return (np.concatenate([pad, x]) if front else np.concatenate([x, pad]))[:n_even]
+
+    # Odd rows give x_odd = R - L x_left - U x_right; substitute into the even rows.
+    inv = np.linalg.inv(diag[1::2])
+    odd_lower, odd_upper, odd_rhs = inv @ lower[1::2], inv @ upper[1::2], inv @ rhs[1::2]
+    even_lower = lower[::2].copy()
+    even_lower[0] = 0.0
+    even_upper = upper[::2].copy()
+    if len(diag) % 2:
+        even_upper[-1] = 0.0
+    x_even = solve_block_tridiagonal(
+        -even_lower @ shifted(odd_lower, True),
+        diag[::2] - even_lower @ shifted(odd_upper, True) - even_upper @ shifted(odd_lower, False),
+        -even_upper @ shifted(odd_upper, False),
+        rhs[::2] - even_lower @ shifted(odd_rhs, True) - even_upper @ shifted(odd_rhs, False))
+
+    x = np.empty_like(rhs)
+    x[::2] = x_even
+    x_right = np.concatenate([x_even[1:], np.zeros((1,) + x_even.shape[1:])])[:len(odd_rhs)]
+    x[1::2] = odd_rhs - odd_lower @ x_even[:len(odd_rhs)] - odd_upper @ x_right
+    return x
+
+
+def _hermite_rows(t):
+    """
+    Weights of [p0, v0, a0, p1, v1, a1] in the segment value at local parameters t, shape (len(t), 6).
+    """
+    return power_basis(t) @ _HERMITE_BASIS
+
+
+def _locate(breaks, u):
+    """
+    Segment index and local parameter of data parameters u for knots at parameters `breaks`.
+    """
+    seg = np.clip(np.searchsorted(breaks, u, side='right') - 1, 0, len(breaks) - 2)
+    return seg, (u - breaks[seg]) / (breaks[seg + 1] - breaks[seg])
+
+
+def _fit_knots(points, u, breaks, smoothing):
+    """
+    Least-squares knot values for fixed knot parameters `breaks`.
+    Returns: array of shape (len(breaks), 3, dim)
+    """
+    n_seg, dim = len(breaks) - 1, points.shape[1]
+    normal = np.zeros((n_seg, 6, 6))
+    rhs = np.zeros((n_seg, 6, dim))
+    i, j = np.triu_indices(6)
+    for start in range(0, len(points), _BLOCK_POINTS):
+        block = slice(start, start + _BLOCK_POINTS)
+        seg, t = _locate(breaks, u[block])
+        h = _hermite_rows(t)
+        for a, b in zip(i, j):
+            normal[:, a, b] += np.bincount(seg, weights=h[:, a] * h[:, b], minlength=n_seg)
+        for a in range(6):
+            for d in range(dim):
+                rhs[:, a, d] += np.bincount(seg, weights=h[:, a] * points[block, d], minlength=n_seg)
+    normal[:, j, i] = normal[:, i, j]
+    normal += smoothing * _SMOOTHING
+
+    # Knot k collects the end block of segment k - 1 and the start block of segment k.
+    diag = np.zeros((n_seg + 1, 3, 3))
+    diag[:-1] += normal[:, :3, :3]
+    diag[1:] += normal[:, 3:, 3:]
+    upper = np.zeros_like(diag)
+    upper[:-1] = normal[:, :3, 3:]
+    lower = np.zeros_like(diag)
+    lower[1:] = normal[:, 3:, :3]
+    knot_rhs = np.zeros((n_seg + 1, 3, dim))
+    knot_rhs[:-1] += rhs[:, :3]
+    knot_rhs[1:] += rhs[:, 3:]
+    return solve_block_tridiagonal(lower, diag, upper, knot_rhs)
+
+
+def _segment_errors(spline, points, u, breaks):
+    """
+    Largest distance between the spline and the points assigned to each segment.
+    """
+    seg, t = _locate(breaks, u)
+    distance = np.zeros(len(breaks) - 1)
+    for start in range(0, len(points), _BLOCK_POINTS):
+        block = slice(start, start + _BLOCK_POINTS)
+        residual = np.linalg.norm(spline.evaluate(seg[block] + t[block]) - points[block], axis=1)
+        np.maximum.at(distance, seg[block], residual)
+    return distance
+
+
+@instrumented("fitting.fit_spline")
+def fit_spline(points, n_segments=16, params=None, tol=None, max_segments=100000,
+               smoothing=1e-6, corrections=0):
+    """
+    Fit a QuinticHermiteSpline to points ordered along a curve.
+    :param points: array of shape (P, dim)
+    :param n_segments: number of segments, or the starting number when tol is given
+    :param params: optional increasing parameter per point; defaults to cumulative chord length.
+                   Knots are placed uniformly in this parameter.
+    :param tol: if given, segments whose largest point distance exceeds tol are split in two
+                and the fit repeated, until every segment meets tol or max_segments is reached
+    :param smoothing: weight of the integral of |x''(t)|^2 over each segment, which keeps
+                      segments without enough points well posed
+    :param corrections: number of parameter-correction passes, each re-projecting the points
+                        onto the current fit before fitting again
+    Returns: QuinticHermiteSpline with segment i covering the i-th knot interval
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or len(points) < 2:
+        raise ValueError("points must have shape (P, dim) with at least two points.")
+    if params is None:
+        params = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+    u = np.asarray(params, dtype=float)
+    if u.shape != (len(points),) or np.any(np.diff(u) < 0) or u[-1] <= u[0]:
+        raise ValueError("params must be non-decreasing, one per point, and not all equal.")
+    u = (u - u[0]) / (u[-1] - u[0])
+    breaks = np.linspace(0.0, 1.0, n_segments + 1)
+
+    while True:
+        for correction in range(corrections + 1):
+            knots = _fit_knots(points, u, breaks, smoothing)
+            spline = QuinticHermiteSpline.from_controls(knots[:, 0], knots[:, 1], knots[:, 2])
+            if correction < corrections:
+                # Move every point's parameter to that of its closest spline point.
+                s = np.clip(spline.closest_point(points)[0], 0, len(breaks) - 1)
+                seg = np.minimum(np.floor(s).astype(np.intp), len(breaks) - 2)
+                u = breaks[seg] + (s - seg) * (breaks[seg + 1] - breaks[seg])
+        if tol is None:
+            return spline
+        split = _segment_errors(spline, points, u, breaks) > tol
+        split &= np.diff(breaks) > 1e-12
+        if not split.any() or len(breaks) - 1 >= max_segments:
+            return spline
+        room = max_segments - (len(breaks) - 1)
+        split[np.flatnonzero(split)[room:]] = False
+        midpoints = 0.5 * (breaks[:-1] + breaks[1:])[split]
+        breaks = np.sort(np.concatenate([breaks, midpoints]))
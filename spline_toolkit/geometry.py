@@ -0,0 +1,83 @@
+"""
+Differential geometry of curves from their parameter derivatives.
+
+Every function takes derivative arrays of shape (..., dim), so fields over millions of
+parameters come from one batched Horner pass followed by a few array operations. Points where
+the first derivative vanishes get zero tangents, normals and curvatures rather than NaNs.
+"""
+import numpy as np
+
+
+def _unit(vectors):
+    length = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, length, out=np.zeros_like(vectors), where=length > 0)
+
+
+def _dot(a, b):
+    return np.einsum('...i,...i->...', a, b)
+
+
+def _cross_2d(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _divide(a, b):
+    a, b = np.broadcast_arrays(a, b)
+    return np.divide(a, b, out=np.zeros(a.shape), where=b > 0)
+
+
+def unit_tangent(d1):
+    return _unit(np.asarray(d1, dtype=float))
+
+
+def left_normal(d1):
+    """
+    Unit tangent rotated a quarter turn counterclockwise (2D).
+    """
+    tangent = unit_tangent(d1)
+    return np.stack([-tangent[..., 1], tangent[..., 0]], axis=-1)
+
+
+def curvature_vector(d1, d2):
+    """
+    Curvature times the principal normal, (x'' - (x'' . T) T) / |x'|^2, in any dimension.
+    """
+    d1 = np.asarray(d1, dtype=float)
+    d2 = np.asarray(d2, dtype=float)
+    speed_sq = _dot(d1, d1)
+    normal_part = d2 - _divide(_dot(d2, d1), speed_sq)[..., None] * d1
+    return _divide(normal_part, speed_sq[..., None])
+
+
+def principal_normal(d1, d2):
+    """
+    Unit principal normal, pointing toward the centre of curvature; zero where the curve is straight.
+    """
+    return _unit(curvature_vector(d1, d2))
+
+
+def curvature(d1, d2):
+    """
+    Unsigned curvature sqrt(|x'|^2 |x''|^2 - (x' . x'')^2) / |x'|^3 in any dimension.
+    """
+    d1 = np.asarray(d1, dtype=float)
+    d2 = np.asarray(d2, dtype=float)
+    speed_sq = _dot(d1, d1)
+    area_sq = np.maximum(speed_sq * _dot(d2, d2) - _dot(d1, d2) ** 2, 0.0)
+    return _divide(np.sqrt(area_sq), speed_sq ** 1.5)
+
+
+def signed_curvature(d1, d2):
+    """
+    Curvature of a 2D curve, positive where it turns counterclockwise (toward left_normal).
+    """
+    d1 = np.asarray(d1, dtype=float)
+    return _divide(_cross_2d(d1, np.asarray(d2, dtype=float)), _dot(d1, d1) ** 1.5)
+
+
+def torsion(d1, d2, d3):
+    """
+    Torsion (x' x x'') . x''' / |x' x x''|^2 of a 3D curve; zero where the curve is straight.
+    """
+    normal = np.cross(d1, d2)
+    return _divide(_dot(normal, np.asarray(d3, dtype=float)), _dot(normal, normal))
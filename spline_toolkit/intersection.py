@@ -0,0 +1,213 @@
+"""
+Intersections of curves with curves and with planes, computed on segment coefficients.
+
+Curve-curve intersections pair up segments with a simultaneous descent of both segment
+hierarchies, then subdivide every surviving pair of parameter intervals in lock step,
+discarding pairs whose Bezier hulls do not overlap, and polish the remaining pairs with
+Gauss-Newton steps. Runs of touching cells whose polished points spread along the run are
+stretches where the curves coincide, and collapse to the two ends of the overlap.
+Curve-plane intersections are the real roots of one scalar polynomial per segment, after
+discarding segments whose Bezier coefficients all share one sign.
+"""
+import numpy as np
+from .polynomial import derivative_stack, horner, real_roots, reparametrize, to_bernstein
+from .profiling import instrumented
+
+
+def _boxes_overlap(a, b, pad=0.0):
+    """
+    Whether boxes (..., 2, dim) overlap, after growing both by pad.
+    """
+    return np.all((a[..., 0, :] <= b[..., 1, :] + pad) & (b[..., 0, :] <= a[..., 1, :] + pad), axis=-1)
+
+
+def _hull_boxes(coefficients, index, lo, hi):
+    """
+    Axis-aligned boxes around the Bezier control points of segments[index] restricted to [lo, hi].
+    """
+    control = to_bernstein(reparametrize(coefficients[index], lo[:, None], hi[:, None]))
+    return np.stack([control.min(axis=-1), control.max(axis=-1)], axis=1)
+
+
+def _unique_pairs(s, u, points, eps):
+    """
+    Merge parameter pairs closer than eps in both parameters, keeping the first of each run.
+    """
+    order = np.lexsort((u, s))
+    s, u, points = s[order], u[order], points[order]
+    keep = np.ones(len(s), dtype=bool)
+    keep[1:] = (np.diff(s) > eps) | (np.abs(np.diff(u)) > eps)
+    return s[keep], u[keep], points[keep]
+
+
+def segment_pairs(bvh_a, bvh_b, pad=0.0):
+    """
+    Segment pairs whose bounding boxes overlap, by descending both hierarchies together.
+    :param bvh_a, bvh_b: SegmentBVH instances
+    Returns: (segs_a, segs_b) index arrays
+    """
+    la, lb = len(bvh_a.levels) - 1, len(bvh_b.levels) - 1
+    na = nb = np.zeros(1, dtype=np.intp)
+    while True:
+        keep = _boxes_overlap(bvh_a.levels[la][na], bvh_b.levels[lb][nb], pad)
+        na, nb = na[keep], nb[keep]
+        if la == 0 and lb == 0:
+            return na, nb
+        # Split the side with more levels left (both if equal), keeping existing children only.
+        if la >= lb:
+            la -= 1
+            na, nb = (na[:, None] * 2 + np.arange(2)).ravel(), np.repeat(nb, 2)
+            exists = na < len(bvh_a.levels[la])
+            na, nb = na[exists], nb[exists]
+        if lb > la:
+            lb -= 1
+            na, nb = np.repeat(na, 2), (nb[:, None] * 2 + np.arange(2)).ravel()
+            exists = nb < len(bvh_b.levels[lb])
+            na, nb = na[exists], nb[exists]
+
+
+def _components(keys_a, keys_b):
+    """
+    Connected components of grid cells (keys_a, keys_b), cells touching in both keys being
+    connected, by vectorized hooking and pointer jumping. Returns: component label per cell
+    """
+    stride = keys_b.max() + 3 if len(keys_b) else 1
+    keys = keys_a * stride + keys_b + 1
+    order = np.argsort(keys)
+    ordered = keys[order]
+    first, second = [], []
+    for offset in (1, stride - 1, stride, stride + 1):
+        at = np.minimum(np.searchsorted(ordered, ordered + offset), len(ordered) - 1)
+        hit = ordered[at] == ordered + offset
+        first.append(np.flatnonzero(hit))
+        second.append(at[hit])
+    first, second = np.concatenate(first), np.concatenate(second)
+    parent = np.arange(len(keys))
+    while True:
+        low = np.minimum(parent[first], parent[second])
+        high = np.maximum(parent[first], parent[second])
+        merge = low != high
+        if not merge.any():
+            break
+        np.minimum.at(parent, high[merge], low[merge])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    labels = np.empty_like(parent)
+    labels[order] = parent
+    return labels
+
+
+@instrumented("intersection.curves", points=lambda result: len(result[0]))
+def curve_intersections(bvh_a, bvh_b, tol=1e-9, max_depth=10, iterations=8,
+                        max_candidates=1 << 20, return_overlaps=False):
+    """
+    Intersections between two curves.
+
+    Where the curves overlap along a stretch, every subdivision cell of the stretch survives
+    and polishes to its own point. Such runs of touching cells are collapsed to the two ends
+    of the overlap, which are reported as intersections, and, with return_overlaps, also as
+    overlap intervals.
+    :param bvh_a, bvh_b: SegmentBVH instances of the two curves
+    :param tol: maximum distance between the two curve points of a reported intersection
+    :param max_depth: number of interval halvings before switching to Newton polishing
+    :param max_candidates: halving stops early once this many candidate pairs survive
+    :param return_overlaps: also return an (K, 2, 2) array of overlaps, each
+                            [[s_a start, s_a end], [s_b at start, s_b at end]]
+    Returns: (s_a, s_b, points) with global parameters of both curves, sorted along curve a
+    """
+    ca, cb = bvh_a.coefficients, bvh_b.coefficients
+    seg_a, seg_b = segment_pairs(bvh_a, bvh_b, pad=tol)
+    lo_a, lo_b = np.zeros(len(seg_a)), np.zeros(len(seg_b))
+    width = 1.0
+    for depth in range(max_depth + 1):
+        keep = _boxes_overlap(_hull_boxes(ca, seg_a, lo_a, lo_a + width),
+                              _hull_boxes(cb, seg_b, lo_b, lo_b + width), pad=tol)
+        seg_a, seg_b, lo_a, lo_b = seg_a[keep], seg_b[keep], lo_a[keep], lo_b[keep]
+        if depth == max_depth or 4 * len(seg_a) > max_candidates:
+            break
+        # Halve both intervals: every pair becomes four.
+        width *= 0.5
+        half = np.array([0.0, width])
+        seg_a, seg_b = np.repeat(seg_a, 4), np.repeat(seg_b, 4)
+        lo_a = (lo_a[:, None] + np.repeat(half, 2)).ravel()
+        lo_b = (lo_b[:, None] + np.tile(half, 2)).ravel()
+
+    # Gauss-Newton on a(s) - b(u) = 0 from the centre of every surviving pair.
+    s, u = lo_a + 0.5 * width, lo_b + 0.5 * width
+    stack_a, stack_b = derivative_stack(ca, (0, 1)), derivative_stack(cb, (0, 1))
+    for _ in range(iterations):
+        xa, va = np.moveaxis(horner(stack_a, s[:, None], index=seg_a), 1, 0)
+        xb, vb = np.moveaxis(horner(stack_b, u[:, None], index=seg_b), 1, 0)
+        r = xa - xb
+        jac = np.stack([va, -vb], axis=-1)
+        jtj = np.swapaxes(jac, -1, -2) @ jac + 1e-14 * np.eye(2)
+        step = np.linalg.solve(jtj, (np.swapaxes(jac, -1, -2) @ r[..., None]))[..., 0]
+        s = np.clip(s - step[:, 0], 0.0, 1.0)
+        u = np.clip(u - step[:, 1], 0.0, 1.0)
+
+    xa = horner(ca, s, index=seg_a)
+    found = np.linalg.norm(xa - horner(cb, u, index=seg_b), axis=-1) <= tol
+    s, u, xa = seg_a[found] + s[found], seg_b[found] + u[found], xa[found]
+    cell_a = np.rint((seg_a[found] + lo_a[found]) / width).astype(np.int64)
+    cell_b = np.rint((seg_b[found] + lo_b[found]) / width).astype(np.int64)
+    if len(s) == 0:
+        return (s, u, xa) + ((np.empty((0, 2, 2)),) if return_overlaps else ())
+
+    # A crossing polishes all its cells to one point; an overlap spreads them along the run.
+    labels = _components(cell_a, cell_b)
+    order = np.lexsort((s, labels))
+    labels, s, u, xa = labels[order], s[order], u[order], xa[order]
+    starts = np.flatnonzero(np.diff(labels, prepend=-1))
+    ends = np.append(starts[1:], len(labels)) - 1
+    overlap = s[ends] - s[starts] >= 2 * width
+    in_overlap = np.repeat(overlap, ends - starts + 1)
+    if overlap.any():
+        # Polishing leaves the ends of a run inside its end cells; move them out to the
+        # outer cell boundaries wherever those still lie on the other curve.
+        cell_a = cell_a[order]
+        bounds = np.concatenate([np.minimum.reduceat(cell_a, starts)[overlap],
+                                 np.maximum.reduceat(cell_a, starts)[overlap] + 1]) * width
+        bounds = np.clip(bounds, 0.0, len(ca))
+        seg = np.minimum(np.floor(bounds).astype(np.intp), len(ca) - 1)
+        points = horner(ca, bounds - seg, index=seg)
+        seg_b, t_b, _, distance = bvh_b.closest_point(points)
+        near = distance <= tol
+        at = np.concatenate([starts[overlap], ends[overlap]])[near]
+        s[at], u[at], xa[at] = bounds[near], (seg_b + t_b)[near], points[near]
+    ends_of_runs = np.concatenate([starts[overlap], ends[overlap]])
+    keep = ~in_overlap
+    keep[ends_of_runs] = True
+    result = _unique_pairs(s[keep], u[keep], xa[keep], eps=max(np.sqrt(tol), 1e-6))
+    if return_overlaps:
+        overlaps = np.stack([np.stack([s[starts[overlap]], s[ends[overlap]]], axis=-1),
+                             np.stack([u[starts[overlap]], u[ends[overlap]]], axis=-1)], axis=1)
+        return result + (overlaps.reshape(-1, 2, 2),)
+    return result
+
+
+@instrumented("intersection.plane", points=lambda result: len(result[0]))
+def plane_intersections(coefficients, point, normal):
+    """
+    Intersections of a curve with the hyperplane through point with the given normal
+    (a line in 2D, a plane in 3D).
+    :param coefficients: array of shape (N, dim, 6)
+    Returns: (s, points) with global parameters sorted along the curve
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    normal = np.asarray(normal, dtype=float)
+    if not np.any(normal):
+        raise ValueError("normal must be non-zero.")
+    signed = np.einsum('i,nik->nk', normal, coefficients)
+    signed[:, 0] -= normal @ np.asarray(point, dtype=float)
+    # A segment whose Bezier coefficients all lie strictly on one side cannot cross.
+    bern = to_bernstein(signed)
+    segs = np.flatnonzero((bern.min(axis=1) <= 0) & (bern.max(axis=1) >= 0))
+    ids, t = real_roots(signed[segs])
+    s = segs[ids] + t
+    # A crossing exactly at a knot is found by both neighbouring segments.
+    keep = np.diff(s, prepend=-np.inf) > 1e-9
+    s = s[keep]
+    return s, horner(coefficients, t[keep], index=segs[ids][keep])
@@ -0,0 +1,171 @@
+"""
+Compact binary storage for large collections of quintic Hermite splines.
+
+File layout (version 1, little-endian), every section aligned to 64 bytes:
+
+    header        64 bytes: magic, version, dim, n_splines, n_knots, n_segments and the
+                  byte offsets of the three sections below
+    knot_offsets  int64 (n_splines + 1,): spline i owns knots [knot_offsets[i], knot_offsets[i + 1])
+    knots         float64 (n_knots, 3, dim) with [point, tangent, curvature] rows
+    coefficients  float64 (n_segments, dim, 6); spline i owns segments
+                  [knot_offsets[i] - i, knot_offsets[i + 1] - i - 1)
+
+A SplineLibrary maps the sections with np.memmap, so opening a file reads only the header,
+and a spline's data is read from disk when that spline is accessed.
+"""
+import struct
+
+import numpy as np
+from .polynomial import horner
+from .profiling import instrumented
+from .quintic_hermite_segment import QuinticHermiteSegment, knot_coefficients
+from .quintic_hermite_spline import QuinticHermiteSpline
+from .spline_batch import SplineBatch
+
+MAGIC = b"QHSPLIB\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+_ALIGN = 64
+
+
+def _aligned(position):
+    return -(-position // _ALIGN) * _ALIGN
+
+
+def _collect_knots(splines):
+    """
+    Knot arrays and offsets of a SplineBatch or an iterable of splines and segments.
+    """
+    if isinstance(splines, SplineBatch):
+        knots = splines.knots
+        offsets = np.arange(len(splines) + 1) * knots.shape[1]
+        return knots.reshape((-1,) + knots.shape[2:]), offsets
+    knots = [spline.knots for spline in splines]
+    if not knots:
+        raise ValueError("At least one spline must be provided.")
+    offsets = np.concatenate([[0], np.cumsum([len(k) for k in knots])])
+    return np.concatenate(knots), offsets
+
+
+class SplineLibrary:
+    """
+    Read-only, memory-mapped collection of splines stored with SplineLibrary.save.
+    """
+    def __init__(self, path):
+        """
+        Open a library file. Only the header is read; the arrays are memory-mapped.
+        """
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a spline library file.")
+        (_, version, dim, n_splines, n_knots, n_segments,
+         index_at, knots_at, coefficients_at) = _HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"Unsupported spline library version {version} (expected {VERSION}).")
+        self.path = path
+        self.dim = dim
+        self.knot_offsets = np.memmap(path, dtype="<i8", mode="r", offset=index_at, shape=(n_splines + 1,))
+        self._knots = np.memmap(path, dtype="<f8", mode="r", offset=knots_at, shape=(n_knots, 3, dim))
+        self._coefficients = np.memmap(path, dtype="<f8", mode="r", offset=coefficients_at,
+                                       shape=(n_segments, dim, 6))
+
+    @classmethod
+    def save(cls, path, splines):
+        """
+        Write splines to path in one bulk pass and open the result.
+        :param splines: a SplineBatch, or an iterable of QuinticHermiteSpline / QuinticHermiteSegment
+        """
+        knots, offsets = _collect_knots(splines)
+        return cls.save_arrays(path, knots, offsets)
+
+    @classmethod
+    @instrumented("library.save")
+    def save_arrays(cls, path, knots, knot_offsets):
+        """
+        Write concatenated knot data to path and open the result.
+        :param knots: array of shape (n_knots, 3, dim), all splines back to back
+        :param knot_offsets: array of shape (n_splines + 1,) delimiting each spline's knots
+        """
+        knots = np.asarray(knots, dtype=float)
+        knot_offsets = np.asarray(knot_offsets, dtype=np.int64)
+        if knots.ndim != 3 or knots.shape[1] != 3:
+            raise ValueError("knots must have shape (n_knots, 3, dim).")
+        if knot_offsets[0] != 0 or knot_offsets[-1] != len(knots) or np.any(np.diff(knot_offsets) < 2):
+            raise ValueError("knot_offsets must run from 0 to n_knots with at least two knots per spline.")
+        n_splines, dim = len(knot_offsets) - 1, knots.shape[-1]
+        # Segments are computed over the concatenation; drop those bridging two splines.
+        bridging = np.zeros(max(len(knots) - 1, 0), dtype=bool)
+        bridging[knot_offsets[1:-1] - 1] = True
+        coefficients = knot_coefficients(knots)[~bridging]
+
+        index_at = _aligned(_HEADER.size)
+        knots_at = _aligned(index_at + knot_offsets.nbytes)
+        coefficients_at = _aligned(knots_at + knots.nbytes)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, dim, n_splines, len(knots), len(coefficients),
+                                 index_at, knots_at, coefficients_at))
+            for position, array in ((index_at, knot_offsets), (knots_at, knots), (coefficients_at, coefficients)):
+                f.seek(position)
+                np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")).tofile(f)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.knot_offsets) - 1
+
+    def _segment_range(self, i):
+        i = range(len(self))[i]
+        return slice(int(self.knot_offsets[i]) - i, int(self.knot_offsets[i + 1]) - i - 1)
+
+    def knots(self, i):
+        """
+        Memory-mapped knot data of spline i, of shape (n_knots, 3, dim).
+        """
+        i = range(len(self))[i]
+        return self._knots[int(self.knot_offsets[i]):int(self.knot_offsets[i + 1])]
+
+    def coefficients(self, i):
+        """
+        Memory-mapped coefficient tensor of spline i, of shape (n_segments, dim, 6).
+        """
+        return self._coefficients[self._segment_range(i)]
+
+    def n_segments(self, i):
+        seg = self._segment_range(i)
+        return seg.stop - seg.start
+
+    def __getitem__(self, i):
+        """
+        Load spline i as a standalone QuinticHermiteSpline, reusing the stored coefficients.
+        """
+        return QuinticHermiteSpline._from_arrays(self.knots(i), self.coefficients(i))
+
+    def segment(self, i):
+        """
+        Load a one-segment spline i as a standalone QuinticHermiteSegment.
+        """
+        knots = np.array(self.knots(i))
+        if len(knots) != 2:
+            raise ValueError(f"Spline {i} has {len(knots) - 1} segments, not one.")
+        return QuinticHermiteSegment(knots[:, 0], knots[:, 1], knots[:, 2])
+
+    def evaluate(self, i, s):
+        """
+        Evaluate spline i at global parameters s straight from the mapped coefficients.
+        """
+        coefficients = self.coefficients(i)
+        s = np.asarray(s, dtype=float)
+        idx = np.clip(np.floor(s).astype(np.intp), 0, len(coefficients) - 1)
+        return horner(coefficients, s - idx, index=idx)
+
+    def batch(self, indices):
+        """
+        Load the given splines, which must share one knot count, as a SplineBatch.
+        """
+        indices = np.arange(len(self))[np.asarray(indices, dtype=np.intp)]
+        counts = self.knot_offsets[indices + 1] - self.knot_offsets[indices]
+        if len(indices) == 0 or np.any(counts != counts[0]):
+            raise ValueError("A batch needs at least one spline and equal knot counts.")
+        rows = self.knot_offsets[indices][:, None] + np.arange(counts[0])
+        return SplineBatch(self._knots[rows])
@@ -0,0 +1,112 @@
+"""
+Solving x_axis(s) = value for many values at once.
+
+One coordinate of each segment is split at the real roots of its derivative into pieces on
+which it is monotone. A value lies on a piece exactly when it lies between the piece's end
+values, so each query is matched to its pieces by binary search over the sorted values, and
+every (piece, value) pair has a single root, found by Newton steps kept inside a shrinking
+bracket. For a curve that is monotone in the axis, every value has one solution and the
+other coordinates of the curve become an explicit function of it.
+"""
+import numpy as np
+from .polynomial import derivative_coefficients, horner, real_roots
+from .profiling import instrumented
+
+# Upper bound on safeguarded Newton iterations; each one at least halves a stalled bracket.
+_MAX_ITERATIONS = 60
+
+
+class MonotonePieces:
+    """
+    Pieces of a curve on which one coordinate is monotone, precomputed for repeated solves.
+    """
+    def __init__(self, coefficients, axis=0):
+        """
+        :param coefficients: array of shape (N, dim, 6)
+        :param axis: the coordinate to solve for
+        """
+        coefficients = np.asarray(coefficients, dtype=float)
+        if not 0 <= axis < coefficients.shape[1]:
+            raise ValueError(f"axis must be between 0 and {coefficients.shape[1] - 1}.")
+        self.axis = axis
+        self._poly = coefficients[:, axis:axis + 1]
+        self._dpoly = derivative_coefficients(self._poly, 1)
+        n = len(coefficients)
+        ids, roots = real_roots(self._dpoly[:, 0])
+        breaks_seg = np.concatenate([np.arange(n), ids, np.arange(n)])
+        breaks_t = np.concatenate([np.zeros(n), roots, np.ones(n)])
+        order = np.lexsort((breaks_t, breaks_seg))
+        breaks_seg, breaks_t = breaks_seg[order], breaks_t[order]
+        # Consecutive breaks of one segment bound a piece; drop repeated (double) roots.
+        piece = (breaks_seg[1:] == breaks_seg[:-1]) & (breaks_t[1:] > breaks_t[:-1])
+        self.segments = breaks_seg[:-1][piece]
+        self.lo = breaks_t[:-1][piece]
+        self.hi = breaks_t[1:][piece]
+        self.f_lo = horner(self._poly, self.lo, index=self.segments)[:, 0]
+        self.f_hi = horner(self._poly, self.hi, index=self.segments)[:, 0]
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _pairs(self, values):
+        """
+        (piece, value index) pairs such that the value lies within the piece's range.
+        """
+        order = np.argsort(values, kind='stable')
+        ordered = values[order]
+        bottom = np.minimum(self.f_lo, self.f_hi)
+        top = np.maximum(self.f_lo, self.f_hi)
+        first = np.searchsorted(ordered, bottom, side='left')
+        counts = np.searchsorted(ordered, top, side='right') - first
+        pieces = np.repeat(np.arange(len(self)), counts)
+        offsets = np.arange(len(pieces)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return pieces, order[first[pieces] + offsets]
+
+    @instrumented("monotone.solve", points=lambda result: len(result[0]))
+    def solve(self, values, tol=1e-14):
+        """
+        Every global parameter s at which the coordinate equals each of the values.
+        A piece on which the coordinate is constant and equal to a value reports its start.
+        :param values: array of shape (V,)
+        :param tol: parameter tolerance at which Newton iteration stops
+        Returns: (value_ids, s), 1D arrays ordered by value then parameter
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        pieces, value_ids = self._pairs(values)
+        seg = self.segments[pieces]
+        lo, hi = self.lo[pieces], self.hi[pieces]
+        target = values[value_ids]
+        # Orient every bracket so that f - target is <= 0 at lo and >= 0 at hi.
+        f_lo, f_hi = self.f_lo[pieces] - target, self.f_hi[pieces] - target
+        rising = f_hi >= f_lo
+        a, b = np.where(rising, lo, hi), np.where(rising, hi, lo)
+        span = np.abs(f_hi - f_lo)
+        t = a + (b - a) * np.divide(-np.minimum(f_lo, f_hi), span, out=np.zeros_like(span), where=span > 0)
+
+        active = np.flatnonzero(span > 0)
+        for _ in range(_MAX_ITERATIONS):
+            if len(active) == 0:
+                break
+            ta, sa = t[active], seg[active]
+            f = horner(self._poly, ta, index=sa)[:, 0] - target[active]
+            df = horner(self._dpoly, ta, index=sa)[:, 0]
+            below = f < 0
+            a[active] = np.where(below, ta, a[active])
+            b[active] = np.where(below, b[active], ta)
+            step = np.divide(f, df, out=np.full_like(f, np.inf), where=df != 0)
+            trial = ta - step
+            # Newton steps leaving the bracket fall back to bisection.
+            inside = (trial - a[active]) * (trial - b[active]) < 0
+            trial = np.where(inside, trial, 0.5 * (a[active] + b[active]))
+            t[active] = trial
+            done = (np.abs(trial - ta) <= tol) | (np.abs(b[active] - a[active]) <= tol) | (f == 0)
+            t[active[f == 0]] = ta[f == 0]
+            active = active[~done]
+
+        s = seg + t
+        order = np.lexsort((s, value_ids))
+        value_ids, s = value_ids[order], s[order]
+        # A root at a knot or at a turning point is found by both adjoining pieces.
+        keep = np.ones(len(s), dtype=bool)
+        keep[1:] = (np.diff(value_ids) != 0) | (np.diff(s) > 1e-9)
+        return value_ids[keep], s[keep]
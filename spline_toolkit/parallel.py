@@ -0,0 +1,192 @@
+"""
+Opt-in process-pool execution of sampling and evaluation.
+
+Coefficients, parameters and the output buffer live in `multiprocessing.shared_memory`
+blocks. Tasks carry only block names, shapes and index ranges, and every worker writes its
+points straight into the shared output, so no point array is ever pickled.
+
+Use either the context manager, which keeps one pool alive for every call made inside it::
+
+    with parallel(workers=32):
+        points = spline.sample()
+
+or pass `workers=` to a single call, which starts and stops a pool just for that call.
+With the "spawn" or "forkserver" start methods, the usual `if __name__ == "__main__":`
+guard is required in the calling script.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from multiprocessing import shared_memory
+
+import numpy as np
+from .polynomial import horner
+from .profiling import instrumented, point_count
+from .sampling import curvature_weighted_params
+
+# Chunks handed out per worker, so that uneven chunks still balance across the pool.
+_CHUNKS_PER_WORKER = 4
+
+_active = []
+
+
+class _SharedArray:
+    """
+    A numpy array backed by a shared memory block, owned by the creating process.
+    """
+    def __init__(self, shape, dtype=float):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        self.spec = (self._shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def copy_of(cls, values, dtype=float):
+        values = np.asarray(values, dtype=dtype)
+        shared = cls(values.shape, dtype)
+        shared.array[...] = values
+        return shared
+
+    def close(self):
+        del self.array
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _attach(spec):
+    """
+    Open a block created by _SharedArray in a worker. Returns (shm, array).
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _sample_task(coefficients_spec, counts_spec, out_spec, first, last, offset):
+    """
+    Worker: curvature-weighted sample of segments [first, last) written at out[offset:].
+    """
+    blocks = [_attach(spec) for spec in (coefficients_spec, counts_spec, out_spec)]
+    try:
+        (_, coefficients), (_, counts), (_, out) = blocks
+        seg_ids, t = curvature_weighted_params(coefficients[first:last], counts[first:last])
+        out[offset:offset + len(t)] = horner(coefficients[first:last], t, index=seg_ids)
+        del coefficients, counts, out
+    finally:
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _evaluate_task(coefficients_spec, seg_ids_spec, t_spec, out_spec, start, stop):
+    """
+    Worker: out[start:stop] = coefficients[seg_ids] evaluated at t, over [start, stop).
+    """
+    blocks = [_attach(spec) for spec in (coefficients_spec, seg_ids_spec, t_spec, out_spec)]
+    try:
+        (_, coefficients), (_, seg_ids), (_, t), (_, out) = blocks
+        out[start:stop] = horner(coefficients, t[start:stop], index=seg_ids[start:stop])
+        del coefficients, seg_ids, t, out
+    finally:
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _split(weights, n_chunks):
+    """
+    Boundaries splitting len(weights) items into at most n_chunks runs of similar total weight.
+    """
+    cumulative = np.concatenate([[0], np.cumsum(weights)])
+    targets = np.linspace(0, cumulative[-1], n_chunks + 1)
+    bounds = np.searchsorted(cumulative, targets, side='left')
+    bounds[0], bounds[-1] = 0, len(weights)
+    return np.unique(bounds)
+
+
+class ParallelExecutor:
+    """
+    Process pool for sampling and evaluating packed segment coefficients.
+    Entering it as a context manager makes it the default for calls without `workers=`.
+    """
+    def __init__(self, workers=None):
+        """
+        :param workers: number of worker processes (defaults to os.cpu_count())
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        _active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active.remove(self)
+        self._pool.shutdown()
+        self._pool = None
+
+    def _run(self, fn, tasks):
+        if self._pool is None:
+            with self:
+                return self._run(fn, tasks)
+        for future in [self._pool.submit(fn, *task) for task in tasks]:
+            future.result()
+
+    @instrumented("parallel.sample", points=point_count)
+    def sample(self, coefficients, n_points):
+        """
+        Parallel equivalent of sampling.curvature_weighted_sample.
+        :param coefficients: array of shape (N, dim, 6)
+        :param n_points: number of points per segment, an int or an array of shape (N,)
+        Returns: array of shape (sum(n_points), dim), segment by segment
+        """
+        coefficients = np.asarray(coefficients, dtype=float)
+        counts = np.broadcast_to(np.asarray(n_points, dtype=np.intp), (len(coefficients),))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        bounds = _split(counts, self.workers * _CHUNKS_PER_WORKER)
+        with ExitStack() as stack:
+            shared = [_SharedArray.copy_of(coefficients), _SharedArray.copy_of(counts, dtype=np.intp)]
+            out = _SharedArray((offsets[-1], coefficients.shape[1]))
+            for block in shared + [out]:
+                stack.callback(block.close)
+            self._run(_sample_task, [
+                tuple(block.spec for block in shared) + (out.spec, first, last, offsets[first])
+                for first, last in zip(bounds[:-1], bounds[1:])])
+            return out.array.copy()
+
+    @instrumented("parallel.evaluate", points=point_count)
+    def evaluate(self, coefficients, seg_ids, t):
+        """
+        Parallel equivalent of horner(coefficients, t, index=seg_ids) for 1D seg_ids and t.
+        Returns: array of shape (len(t), dim)
+        """
+        coefficients = np.asarray(coefficients, dtype=float)
+        seg_ids, t = np.broadcast_arrays(np.asarray(seg_ids, dtype=np.intp), np.asarray(t, dtype=float))
+        bounds = _split(np.ones(len(t)), self.workers * _CHUNKS_PER_WORKER)
+        with ExitStack() as stack:
+            shared = [_SharedArray.copy_of(coefficients), _SharedArray.copy_of(seg_ids, dtype=np.intp),
+                      _SharedArray.copy_of(t)]
+            out = _SharedArray((len(t), coefficients.shape[1]))
+            for block in shared + [out]:
+                stack.callback(block.close)
+            self._run(_evaluate_task, [
+                tuple(block.spec for block in shared) + (out.spec, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])])
+            return out.array.copy()
+
+
+def parallel(workers=None):
+    """
+    Context manager running sampling and evaluation inside it on a pool of `workers` processes.
+    """
+    return ParallelExecutor(workers)
+
+
+def get_executor(workers=None):
+    """
+    Executor for one call: a temporary pool if `workers` is given (serial if it is 1),
+    otherwise the innermost active `parallel` block, or None to run serially.
+    """
+    if workers is not None:
+        return ParallelExecutor(workers) if workers > 1 else None
+    return _active[-1] if _active else None
@@ -0,0 +1,170 @@
+"""
+Polynomial helpers shared by the quintic Hermite classes.
+
+Coefficient arrays hold monomial coefficients in ascending order along the last axis,
+i.e. coeffs[..., k] multiplies t**k. A segment's coefficients have shape (dim, 6).
+"""
+from math import comb
+
+import numpy as np
+from .profiling import instrumented, point_count
+
+
+def derivative_coefficients(coeffs, order=1):
+    """
+    Differentiate polynomials given as ascending monomial coefficients.
+    :param coeffs: array of shape (..., m)
+    :param order: derivative order (>= 0)
+    Returns: array of shape (..., m - order), or (..., 1) zeros if order >= m.
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    m = coeffs.shape[-1]
+    if order == 0:
+        return coeffs
+    if order >= m:
+        return np.zeros(coeffs.shape[:-1] + (1,))
+    powers = np.arange(order, m)
+    factors = np.ones(m - order)
+    for i in range(order):
+        factors *= powers - i
+    return coeffs[..., order:] * factors
+
+
+def power_basis(t, m=6, order=0):
+    """
+    Matrix of the order-th derivatives of the monomials [1, t, ..., t^(m-1)].
+    :param t: 1D array of parameters
+    Returns: array of shape (len(t), m), so that coeffs @ power_basis(t).T evaluates coeffs at t
+    """
+    t = np.asarray(t, dtype=float)
+    powers = np.arange(m)
+    factors = np.ones(m)
+    for i in range(order):
+        factors *= powers - i
+    return np.where(powers >= order, factors * t[:, None] ** np.maximum(powers - order, 0), 0.0)
+
+
+def reparametrize(coeffs, a, b):
+    """
+    Coefficients of u -> p(a + (b - a) u), so that u in [0, 1] covers t in [a, b].
+    :param coeffs: array of shape (..., m)
+    :param a, b: arrays broadcastable against coeffs.shape[:-1]
+    Returns: array of shape (..., m)
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    m = coeffs.shape[-1]
+    a = np.asarray(a, dtype=float)[..., None, None]
+    h = np.asarray(b, dtype=float)[..., None, None] - a
+    j = np.arange(m)[:, None]
+    k = np.arange(m)[None, :]
+    binom = np.array([[comb(kk, jj) for kk in range(m)] for jj in range(m)], dtype=float)
+    shift = np.where(k >= j, binom * a ** np.maximum(k - j, 0) * h ** j, 0.0)
+    return (shift @ coeffs[..., None])[..., 0]
+
+
+def to_bernstein(coeffs):
+    """
+    Convert ascending monomial coefficients on [0, 1] to Bernstein (Bezier) coefficients.
+    The curve lies in the convex hull of the resulting control points.
+    :param coeffs: array of shape (..., m)
+    Returns: array of shape (..., m)
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    n = coeffs.shape[-1] - 1
+    convert = np.array([[comb(i, j) / comb(n, j) if j <= i else 0.0 for j in range(n + 1)]
+                        for i in range(n + 1)])
+    return coeffs @ convert.T
+
+
+def derivative_stack(coeffs, orders):
+    """
+    Stack the coefficients of several derivatives, zero-padded to a common length,
+    so that they can be evaluated together in a single Horner pass.
+    :param coeffs: array of shape (..., dim, m)
+    :param orders: sequence of derivative orders
+    Returns: array of shape (..., len(orders), dim, m)
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    m = coeffs.shape[-1]
+    stacked = np.zeros(coeffs.shape[:-2] + (len(orders),) + coeffs.shape[-2:])
+    for i, order in enumerate(orders):
+        d = derivative_coefficients(coeffs, order)
+        stacked[..., i, :, :d.shape[-1]] = d[..., :m]
+    return stacked
+
+
+@instrumented("polynomial.horner", points=point_count)
+def horner(coeffs, t, index=None):
+    """
+    Evaluate polynomials at t using Horner's scheme.
+    :param coeffs: array of shape (..., dim, m)
+    :param t: scalar or array broadcastable against coeffs.shape[:-2]
+    :param index: optional integer array selecting coeffs[index] for each t; the gather is
+                  done one power at a time so the selected coefficients are never materialised
+    Returns: array of shape broadcast(t.shape, coeffs.shape[:-2]) + (dim,)
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    t = np.asarray(t, dtype=float)
+    if t.ndim == 0 and index is None:
+        # A single parameter: one small matrix-vector product beats the array bookkeeping below.
+        return coeffs @ t ** np.arange(coeffs.shape[-1])
+    lead = coeffs.shape[:-2] if index is None else np.shape(index) + coeffs.shape[1:-2]
+    shape = np.broadcast_shapes(t.shape, lead)
+    # Accumulate with dim as the leading axis so the inner loops run over the parameters.
+    by_dim = np.moveaxis(coeffs, -2, 0)
+    result = np.zeros((coeffs.shape[-2],) + shape)
+    for k in range(coeffs.shape[-1] - 1, -1, -1):
+        ck = by_dim[..., k] if index is None else by_dim[..., k][:, index]
+        result *= t
+        result += ck.reshape(ck.shape[:1] + (1,) * (len(shape) - ck.ndim + 1) + ck.shape[1:])
+    return np.moveaxis(result, 0, -1)
+
+
+@instrumented("polynomial.real_roots")
+def real_roots(coeffs, lo=0.0, hi=1.0, imag_tol=1e-6):
+    """
+    Real roots in [lo, hi] of many polynomials at once, from batched companion-matrix
+    eigenvalues grouped by effective degree and polished with Newton steps.
+    Identically zero polynomials contribute no roots.
+    :param coeffs: array of shape (K, m), ascending monomial coefficients
+    Returns: (poly_ids, roots), 1D arrays ordered by polynomial then root
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    m = coeffs.shape[-1]
+    coeffs = coeffs.reshape(-1, m)
+    scale = np.abs(coeffs).max(axis=1, keepdims=True)
+    significant = np.abs(coeffs) > 1e-12 * scale
+    degree = np.where(significant.any(axis=1), m - 1 - np.argmax(significant[:, ::-1], axis=1), 0)
+
+    poly_ids, roots = [np.empty(0, dtype=np.intp)], [np.empty(0)]
+    for n in range(1, m):
+        rows = np.flatnonzero(degree == n)
+        if len(rows) == 0:
+            continue
+        c = coeffs[rows, :n + 1]
+        companion = np.zeros((len(rows), n, n))
+        companion[:, np.arange(1, n), np.arange(n - 1)] = 1.0
+        companion[:, :, -1] = -c[:, :n] / c[:, n:]
+        eig = np.linalg.eigvals(companion)
+        keep = np.abs(eig.imag) <= imag_tol * (1.0 + np.abs(eig.real))
+        ids = np.broadcast_to(rows[:, None], eig.shape)[keep]
+        r = eig.real[keep]
+        # Polish with Newton steps, keeping only steps that reduce the residual
+        # (steps near multiple roots can otherwise jump away).
+        poly = coeffs[ids, None, :n + 1]
+        dpoly = derivative_coefficients(poly, 1)
+        f = horner(poly, r)[:, 0]
+        for _ in range(2):
+            df = horner(dpoly, r)[:, 0]
+            trial = r - np.divide(f, df, out=np.zeros_like(f), where=df != 0)
+            f_trial = horner(poly, trial)[:, 0]
+            better = np.abs(f_trial) < np.abs(f)
+            r = np.where(better, trial, r)
+            f = np.where(better, f_trial, f)
+        inside = (r >= lo - 1e-9) & (r <= hi + 1e-9)
+        poly_ids.append(ids[inside])
+        roots.append(np.clip(r[inside], lo, hi))
+    poly_ids = np.concatenate(poly_ids)
+    roots = np.concatenate(roots)
+    order = np.lexsort((roots, poly_ids))
+    return poly_ids[order], roots[order]
@@ -0,0 +1,155 @@
+"""
+Opt-in counters and timers for the library's hot paths.
+
+Instrumented operations record their call count, cumulative wall time and, where it applies,
+the number of points they produced. Nothing is recorded, and the only cost is one list check
+per call, unless a Profile is active::
+
+    with profile() as prof:
+        spline.sample(n_points=10**6)
+    print(prof.to_json(indent=2))
+
+or, for a whole process, enable() / stats() / reset() / disable() on the global registry.
+Times are inclusive: an operation's time contains that of the operations it calls.
+Work done inside `parallel` worker processes is not recorded.
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+_active = []
+_lock = threading.Lock()
+
+
+class Profile:
+    """
+    Per-operation call counts, cumulative seconds and points produced.
+    Entering it as a context manager records every instrumented call made inside it.
+    """
+    def __init__(self):
+        self._stats = {}
+
+    def __enter__(self):
+        with _lock:
+            _active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        with _lock:
+            _active.remove(self)
+
+    def record(self, name, seconds, points=0):
+        entry = self._stats.setdefault(name, [0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += int(points)
+
+    def reset(self):
+        self._stats.clear()
+
+    def as_dict(self):
+        """
+        Statistics as {operation: {"calls": int, "seconds": float, "points": int}}.
+        """
+        return {name: {"calls": calls, "seconds": seconds, "points": points}
+                for name, (calls, seconds, points) in sorted(self._stats.items())}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+_registry = Profile()
+
+
+def profile():
+    """
+    Context manager recording instrumented calls into a fresh Profile.
+    """
+    return Profile()
+
+
+def enable():
+    """
+    Start recording into the global registry.
+    """
+    with _lock:
+        if _registry not in _active:
+            _active.append(_registry)
+
+
+def disable():
+    with _lock:
+        if _registry in _active:
+            _active.remove(_registry)
+
+
+def is_enabled():
+    """
+    Whether any Profile, global or context-managed, is currently recording.
+    """
+    return bool(_active)
+
+
+def stats():
+    """
+    Statistics of the global registry; see Profile.as_dict.
+    """
+    return _registry.as_dict()
+
+
+def reset():
+    _registry.reset()
+
+
+def _record(name, seconds, points):
+    with _lock:
+        for prof in _active:
+            prof.record(name, seconds, points)
+
+
+def instrumented(name, points=None):
+    """
+    Decorator recording each call of the function under `name`.
+    :param points: optional function mapping the return value to the number of points produced
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            _record(name, time.perf_counter() - start, points(result) if points else 0)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def _timed_block(name, points):
+    start = time.perf_counter()
+    yield
+    _record(name, time.perf_counter() - start, points)
+
+
+_NOT_TIMED = nullcontext()
+
+
+def timed(name, points=0):
+    """
+    Context manager recording the enclosed block under `name`, for code that is not a whole function.
+    """
+    if not _active:
+        return _NOT_TIMED
+    return _timed_block(name, points)
+
+
+def point_count(result):
+    """
+    Number of points in an array of shape (..., dim).
+    """
+    return int(np.prod(np.shape(result)[:-1]))
@@ -1,9 +1,83 @@
 import numpy as np
+from .cache import SampleCache, next_version
+from .polynomial import derivative_coefficients, derivative_stack, horner
+from .profiling import instrumented
+from .sampling import adaptive_sample, curvature_magnitude, curvature_weighted_sample
+from .spatial import bounding_boxes
+
+# Inverse of the 6x6 end-condition matrix, mapping [p0, v0, a0, p1, v1, a1] to the
+# monomial coefficients [c0, ..., c5]. The rows of the original system are
+# c0 = p0, c1 = v0, c2 = a0 at t = 0 and x(1) = p1, x'(1) = v1, x''(1) = a1 at t = 1.
+_HERMITE_BASIS = np.array([
+    [  1.0,  0.0,  0.0,   0.0,  0.0,  0.0],
+    [  0.0,  1.0,  0.0,   0.0,  0.0,  0.0],
+    [  0.0,  0.0,  1.0,   0.0,  0.0,  0.0],
+    [-10.0, -6.0, -3.0,  10.0, -4.0,  0.5],
+    [ 15.0,  8.0,  3.0, -15.0,  7.0, -1.0],
+    [ -6.0, -3.0, -1.0,   6.0, -3.0,  0.5],
+])
+
+
+@instrumented("segment.hermite_coefficients")
+def hermite_coefficients(points, tangents, curvatures):
+    """
+    Compute quintic Hermite coefficients for any number of segments at once.
+    :param points: array of shape (N, 2, dim) holding [p0, p1] per segment
+    :param tangents: array of shape (N, 2, dim) holding [v0, v1] per segment
+    :param curvatures: array of shape (N, 2, dim) holding [a0, a1] per segment
+    Leading axes are optional, e.g. (2, dim) inputs give a (dim, 6) result.
+    Returns: array of shape (N, dim, 6)
+    """
+    points = np.asarray(points, dtype=float)
+    tangents = np.asarray(tangents, dtype=float)
+    curvatures = np.asarray(curvatures, dtype=float)
+    if not (points.shape == tangents.shape == curvatures.shape) or points.ndim < 2 or points.shape[-2] != 2:
+        raise ValueError("points, tangents, and curvatures must all have shape (..., 2, dim).")
+    conditions = np.stack([points[..., 0, :], tangents[..., 0, :], curvatures[..., 0, :],
+                           points[..., 1, :], tangents[..., 1, :], curvatures[..., 1, :]], axis=-1)
+    return conditions @ _HERMITE_BASIS.T
+
+
+@instrumented("segment.knot_coefficients")
+def knot_coefficients(knots):
+    """
+    Compute the coefficients of every segment spanned by a sequence of knots.
+    :param knots: array of shape (..., n_knots, 3, dim) with [point, tangent, curvature] rows
+    Returns: array of shape (..., n_knots - 1, dim, 6)
+    """
+    knots = np.asarray(knots, dtype=float)
+    conditions = np.concatenate([knots[..., :-1, :, :], knots[..., 1:, :, :]], axis=-2)
+    return np.swapaxes(conditions, -1, -2) @ _HERMITE_BASIS.T
+
+
+def _end_condition(end, row):
+    """
+    Property exposing one end condition (p0, v0, a0, p1, v1 or a1) of a segment's knot storage.
+    """
+    def getter(self):
+        return self.knots[end, row]
+
+    def setter(self, value):
+        self._assign(row, (end,), [value])
+
+    return property(getter, setter)
+
 
 class QuinticHermiteSegment:
     """
-    Class for Quintic Hermite Spline interpolation."
+    Class for Quintic Hermite Spline interpolation.
+
+    End conditions are held in a (2, 3, dim) knot array of [point, tangent, curvature] rows.
+    A segment belonging to a QuinticHermiteSpline is a view into the spline's packed storage,
+    so edits through its setters update the spline and the neighbouring segments.
     """
+    p0 = _end_condition(0, 0)
+    v0 = _end_condition(0, 1)
+    a0 = _end_condition(0, 2)
+    p1 = _end_condition(1, 0)
+    v1 = _end_condition(1, 1)
+    a1 = _end_condition(1, 2)
+
     def __init__(self, points, tangents, curvatures):
         """
         Initialize a Quintic Hermite Segment using grouped position, velocity, and acceleration.
@@ -12,21 +86,92 @@ class QuinticHermiteSegment:
         :param curvatures: [a0, a1]
         All entries must be array-like of the same shape (1D, 2D, or 3D).
         """
-        self.p0, self.p1 = np.array(points[0]), np.array(points[1])
-        self.v0, self.v1 = np.array(tangents[0]), np.array(tangents[1])
-        self.a0, self.a1 = np.array(curvatures[0]), np.array(curvatures[1])
+        p0, p1 = np.array(points[0], dtype=float), np.array(points[1], dtype=float)
+        v0, v1 = np.array(tangents[0], dtype=float), np.array(tangents[1], dtype=float)
+        a0, a1 = np.array(curvatures[0], dtype=float), np.array(curvatures[1], dtype=float)
 
-        if not (self.p0.shape == self.p1.shape == self.v0.shape == self.v1.shape == self.a0.shape == self.a1.shape):
+        if not (p0.shape == p1.shape == v0.shape == v1.shape == a0.shape == a1.shape):
             raise ValueError("All inputs must have the same shape (1D, 2D, or 3D).")
 
-        self.dim = self.p0.shape[0]
+        self.dim = p0.shape[0]
+        self._owner = None
+        self._index = None
+        self._knots = np.array([[p0, v0, a0], [p1, v1, a1]])
+        self._coefficients = None
+        self._dirty = True
+        self._version = next_version()
+        self.sample_cache = SampleCache()
+
+    @classmethod
+    def _view(cls, owner, index):
+        """
+        Create a segment backed by row `index` of a spline's packed storage.
+        """
+        obj = cls.__new__(cls)
+        obj.dim = owner.dim
+        obj._owner = owner
+        obj._index = index
+        obj._knots = None
+        obj._coefficients = None
+        obj._dirty = False
+        obj._version = None
+        obj.sample_cache = SampleCache()
+        return obj
+
+    def _detach(self):
+        """
+        Copy the current data out of the owning spline so the segment stands on its own.
+        """
+        if self._owner is None:
+            return
+        self._knots = self.knots.copy()
+        self._coefficients = self.coefficients.copy()
+        self._dirty = False
+        self._version = next_version()
+        self._owner = None
+        self._index = None
 
-        self.coefficients = np.stack([
-            self._compute_coeffs_1d(self.p0[d], self.p1[d],
-                                    self.v0[d], self.v1[d],
-                                    self.a0[d], self.a1[d])
-            for d in range(self.dim)
-        ], axis=0)
+    def _knot_storage(self):
+        """
+        Writable (2, 3, dim) knot data: a slice of the owning spline's storage, or the segment's own.
+        """
+        if self._owner is not None:
+            return self._owner._knots[self._index:self._index + 2]
+        return self._knots
+
+    @property
+    def knots(self):
+        """
+        Read-only end conditions of shape (2, 3, dim): [[p0, v0, a0], [p1, v1, a1]].
+        Change them through the property setters so the coefficients follow.
+        """
+        knots = self._knot_storage().view()
+        knots.flags.writeable = False
+        return knots
+
+    @property
+    def coefficients(self):
+        """
+        Read-only monomial coefficients of shape (dim, 6), ascending in powers of t.
+        Recomputed lazily after the end conditions change.
+        """
+        if self._owner is not None:
+            coefficients = self._owner._refresh()[self._index]
+        else:
+            if self._dirty:
+                self._recompute_coefficients()
+            coefficients = self._coefficients.view()
+        coefficients.flags.writeable = False
+        return coefficients
+
+    @property
+    def version(self):
+        """
+        Stamp that changes whenever the segment's end conditions change.
+        """
+        if self._owner is not None:
+            return int(self._owner._segment_versions[self._index])
+        return self._version
 
     @property
     def control_points(self):
@@ -36,11 +181,7 @@ class QuinticHermiteSegment:
     def control_points(self, points):
         if len(points) != 2:
             raise ValueError("control_points must contain exactly two points.")
-        p0, p1 = np.array(points[0]), np.array(points[1])
-        if not (p0.shape == p1.shape == self.v0.shape == self.v1.shape == self.a0.shape == self.a1.shape):
-            raise ValueError("All entries must have the same shape (1D, 2D, or 3D).")
-        self.p0, self.p1 = p0, p1
-        self._recompute_coefficients()
+        self._assign(0, (0, 1), points)
 
     @property
     def tangents(self):
@@ -50,11 +191,7 @@ class QuinticHermiteSegment:
     def tangents(self, tangents):
         if len(tangents) != 2:
             raise ValueError("tangents must contain exactly two vectors.")
-        v0, v1 = np.array(tangents[0]), np.array(tangents[1])
-        if not (self.p0.shape == self.p1.shape == v0.shape == v1.shape == self.a0.shape == self.a1.shape):
-            raise ValueError("All entries must have the same shape (1D, 2D, or 3D).")
-        self.v0, self.v1 = v0, v1
-        self._recompute_coefficients()
+        self._assign(1, (0, 1), tangents)
 
     @property
     def curvatures(self):
@@ -64,86 +201,110 @@ class QuinticHermiteSegment:
     def curvatures(self, curvatures):
         if len(curvatures) != 2:
             raise ValueError("curvatures must contain exactly two vectors.")
-        a0, a1 = np.array(curvatures[0]), np.array(curvatures[1])
-        if not (self.p0.shape == self.p1.shape == self.v0.shape == self.v1.shape == a0.shape == a1.shape):
+        self._assign(2, (0, 1), curvatures)
+
+    def _assign(self, row, ends, values):
+        """
+        Write end conditions into the knot storage and mark the affected coefficients dirty.
+        Ends whose stored value already matches are skipped, so they invalidate nothing.
+        :param row: 0 for points, 1 for tangents, 2 for curvatures
+        :param ends: segment ends being written, e.g. (0, 1)
+        :param values: one vector per entry in ends
+        """
+        values = [np.array(v, dtype=float) for v in values]
+        if any(v.shape != (self.dim,) for v in values):
             raise ValueError("All entries must have the same shape (1D, 2D, or 3D).")
-        self.a0, self.a1 = a0, a1
-        self._recompute_coefficients()
+        knots = self._knot_storage()
+        changed = [end for end, value in zip(ends, values) if np.any(knots[end, row] != value)]
+        if not changed:
+            return
+        for end, value in zip(ends, values):
+            knots[end, row] = value
+        if self._owner is not None:
+            self._owner._knots_changed(self._index + np.asarray(changed))
+        else:
+            self._dirty = True
+            self._version = next_version()
 
     def _compute_coeffs_1d(self, p0, p1, v0, v1, a0, a1):
         """
-        Solve for quintic polynomial coefficients in 1D.
+        Compute quintic polynomial coefficients in 1D.
         Returns: np.array([c0, c1, c2, c3, c4, c5])
         """
-        A = np.array([
-            [1, 0, 0,    0,     0,     0],
-            [0, 1, 0,    0,     0,     0],
-            [0, 0, 1,    0,     0,     0],
-            [1, 1, 1,    1,     1,     1],
-            [0, 1, 2,    3,     4,     5],
-            [0, 0, 2,    6,    12,    20],
-        ])
-        b = np.array([p0, v0, a0, p1, v1, a1])
-        return np.linalg.solve(A, b)
+        return _HERMITE_BASIS @ np.array([p0, v0, a0, p1, v1, a1], dtype=float)
 
+    @instrumented("segment.recompute")
     def _recompute_coefficients(self):
-        self.coefficients = np.stack([
-            self._compute_coeffs_1d(self.p0[d], self.p1[d],
-                                    self.v0[d], self.v1[d],
-                                    self.a0[d], self.a1[d])
-            for d in range(self.dim)
-        ], axis=0)
+        if self._owner is not None:
+            self._owner._knots_changed(self._index + np.arange(2))
+            self._owner._refresh()
+            return
+        self._coefficients = knot_coefficients(self._knots)[0]
+        self._dirty = False
 
     def evaluate(self, t):
         """
         Evaluate the segment at parameter t in [0, 1].
+        t may be a scalar or an array of any shape; the result has shape t.shape + (dim,).
+        """
+        return horner(self.coefficients, t)
+
+    def derivative(self, t, order=1):
+        """
+        Evaluate the order-th derivative of the segment with respect to t.
+        :param t: scalar or array of parameters in [0, 1]
+        :param order: derivative order, 1 to 5
+        Returns: array of shape t.shape + (dim,)
+        """
+        if not 1 <= order <= 5:
+            raise ValueError("order must be between 1 and 5.")
+        return horner(derivative_coefficients(self.coefficients, order), t)
+
+    def evaluate_all(self, t):
         """
-        T = np.array([1, t, t**2, t**3, t**4, t**5])
-        return self.coefficients @ T
+        Evaluate position, velocity and acceleration at t in a single Horner pass.
+        Returns: (position, velocity, acceleration), each of shape t.shape + (dim,)
+        """
+        values = horner(derivative_stack(self.coefficients, (0, 1, 2)), np.asarray(t, dtype=float)[..., None])
+        return values[..., 0, :], values[..., 1, :], values[..., 2, :]
+
+    def bounding_box(self):
+        """
+        Exact axis-aligned bounding box of the segment, as [min corner, max corner].
+        """
+        return bounding_boxes(self.coefficients[None])[0]
 
     def _curvature_magnitude(self, t):
         """
-        Estimate the curvature magnitude at parameter t.
+        Estimate the curvature magnitude at parameter t (scalar or array).
         For 2D/3D: ||x'(t) × x''(t)|| / ||x'(t)||^3
         For 1D: curvature is zero.
         """
-        # First and second derivatives
-        T1 = np.array([0, 1, 2*t, 3*t**2, 4*t**3, 5*t**4])
-        T2 = np.array([0, 0, 2, 6*t, 12*t**2, 20*t**3])
-        d1 = self.coefficients @ T1
-        d2 = self.coefficients @ T2
-        if self.dim == 1:
-            return 0.0
-        elif self.dim == 2:
-            # Cross product in 2D is scalar
-            num = np.abs(d1[0]*d2[1] - d1[1]*d2[0])
-            denom = np.linalg.norm(d1)**3 + 1e-8
-            return num / denom
-        else:
-            num = np.linalg.norm(np.cross(d1, d2))
-            denom = np.linalg.norm(d1)**3 + 1e-8
-            return num / denom
+        _, d1, d2 = self.evaluate_all(t)
+        return curvature_magnitude(d1, d2)
 
-    def sample(self, n_points=100):
+    def sample(self, n_points=100, tol=None, max_angle=None):
         """
         Generate sampled points along the segment, biased toward regions of high curvature.
+        If tol or max_angle is given, return instead the adaptive polyline whose distance
+        from the curve is at most tol and whose edges turn by at most max_angle radians.
+        Results are cached per (version, mode, n_points) in `sample_cache` and returned read-only.
         """
-        # 1. Uniformly sample t at high resolution
-        t_hr = np.linspace(0, 1, 500)
-        curvatures = np.array([self._curvature_magnitude(t) for t in t_hr])
-        # Add a small baseline so straight regions still get sampled
-        baseline = 0.01 * np.max(curvatures) if np.max(curvatures) > 0 else 1.0
-        weights = curvatures + baseline
-        # 2. Compute CDF
-        cdf = np.cumsum(weights)
-        cdf = cdf / cdf[-1]
-        # 3. Inverse transform sampling
-        u = np.linspace(0, 1, n_points)
-        t_samples = np.interp(u, cdf, t_hr)
-        self.sampled_points = np.array([self.evaluate(t) for t in t_samples])
+        if tol is not None or max_angle is not None:
+            key = (self.version, "adaptive", (tol, max_angle))
+        else:
+            key = (self.version, "curvature", n_points)
+        self.sample_cache.prune(self.version)
+        points = self.sample_cache.get(key)
+        if points is None:
+            if tol is not None or max_angle is not None:
+                points = adaptive_sample(self.coefficients[None], tol=tol, max_angle=max_angle)
+            else:
+                points = curvature_weighted_sample(self.coefficients[None], n_points)
+            self.sample_cache.put(key, points)
+        self.sampled_points = points
         return self.sampled_points
 
-
     def report(self):
         print("Quintic Hermite Segment Parameters:")
         print(f"p0: {self.p0}, v0: {self.v0}, a0: {self.a0}")
@@ -1,60 +1,205 @@
 import numpy as np
 from spline_toolkit import QuinticHermiteSegment
+from spline_toolkit import geometry
+from spline_toolkit.arc_length import ArcLengthTable
+from spline_toolkit.cache import SampleCache, next_version
+from spline_toolkit.intersection import curve_intersections, plane_intersections
+from spline_toolkit.monotone import MonotonePieces
+from spline_toolkit.parallel import get_executor
+from spline_toolkit.profiling import timed
+from spline_toolkit.polynomial import derivative_coefficients, derivative_stack, horner
+from spline_toolkit.quintic_hermite_segment import knot_coefficients
+from spline_toolkit.sampling import PolylineBuffer, adaptive_sample, iter_curvature_weighted_sample
+from spline_toolkit.spatial import SegmentBVH
 
 
 class QuinticHermiteSpline:
+    """
+    Continuous curve made of quintic Hermite segments.
+
+    Knot data is stored once per knot in a contiguous (n_knots, 3, dim) array of
+    [point, tangent, curvature] rows, and the segment polynomials in a contiguous
+    (n_segments, dim, 6) coefficient array. Segment i covers the global parameter
+    range s in [i, i + 1]. `segments` exposes QuinticHermiteSegment views into this storage.
+    """
     def __init__(self, segment: QuinticHermiteSegment):
-        self.segments = [segment]
+        self._set_knots(segment.knots.copy())
+        self._adopt([segment])
+
+    def _set_knots(self, knots):
+        self._knots = np.ascontiguousarray(knots, dtype=float)
+        self.dim = self._knots.shape[-1]
+        self._coefficients = np.empty((len(self._knots) - 1, self.dim, 6))
+        self._dirty = np.ones(len(self._coefficients), dtype=bool)
+        self._stale = True
+        self._views = [None] * len(self._coefficients)
+        self.sample_cache = SampleCache()
+        self._invalidate_caches()
+        self._segment_versions = next_version(len(self._coefficients))
+        self._tessellation = PolylineBuffer(self.dim)
+
+    def _invalidate_caches(self):
+        """
+        Take a new version stamp and drop data derived from the coefficients
+        after any change to the geometry.
+        """
+        self._version = next_version()
+        self.sample_cache.prune(self._version)
+        self._arc_table = None
+        self._bvh = None
+        self._monotone = {}
+
+    @property
+    def version(self):
+        """
+        Stamp that changes whenever any knot of the spline changes.
+        """
+        return self._version
+
+    def _adopt(self, segments):
+        """
+        Rebind standalone segments as views into this spline's storage.
+        Segments already owned by another spline are left untouched.
+        """
+        for i, seg in enumerate(segments):
+            if seg._owner is None:
+                seg._owner, seg._index = self, i
+                seg._knots = seg._coefficients = None
+                seg._dirty = False
+                self._views[i] = seg
+
+    @property
+    def n_segments(self):
+        return len(self._coefficients)
+
+    @property
+    def knots(self):
+        """
+        Read-only knot data of shape (n_knots, 3, dim) holding [point, tangent, curvature] rows.
+        Change it through the control setters or update_controls so the caches follow.
+        """
+        knots = self._knots.view()
+        knots.flags.writeable = False
+        return knots
+
+    @property
+    def coefficients(self):
+        """
+        Read-only coefficient tensor of shape (n_segments, dim, 6), ascending in powers of t.
+        """
+        coefficients = self._refresh().view()
+        coefficients.flags.writeable = False
+        return coefficients
+
+    @property
+    def tessellation(self):
+        """
+        Persistent PolylineBuffer holding the points of the most recent sample() call and
+        the offset range of every segment within them. After an edit, the next sample()
+        resamples only the segments whose version changed and splices them in place.
+        """
+        return self._tessellation
+
+    @property
+    def segments(self):
+        for i, seg in enumerate(self._views):
+            if seg is None:
+                self._views[i] = QuinticHermiteSegment._view(self, i)
+        return list(self._views)
+
+    def _knots_changed(self, knot_indices=None):
+        """
+        Mark every segment touching the given knots (all if None) as needing new coefficients.
+        """
+        self._invalidate_caches()
+        if knot_indices is None:
+            segs = slice(None)
+        else:
+            knot_indices = np.asarray(knot_indices)
+            segs = np.concatenate([knot_indices - 1, knot_indices])
+            segs = segs[(segs >= 0) & (segs < self.n_segments)]
+        self._dirty[segs] = True
+        self._segment_versions[segs] = next_version(len(self._segment_versions[segs]))
+        self._stale = True
+
+    def _refresh(self):
+        """
+        Recompute the coefficients of all dirty segments in one batched pass.
+        Returns: the up-to-date (n_segments, dim, 6) coefficient array
+        """
+        if self._stale:
+            segs = np.flatnonzero(self._dirty)
+            with timed("spline.recompute"):
+                if len(segs) == self.n_segments:
+                    self._coefficients = knot_coefficients(self._knots)
+                else:
+                    pairs = np.stack([self._knots[segs], self._knots[segs + 1]], axis=1)
+                    self._coefficients[segs] = knot_coefficients(pairs)[:, 0]
+            self._dirty[:] = False
+            self._stale = False
+        return self._coefficients
+
+    def _set_control_row(self, row, values, name):
+        values = np.asarray(values, dtype=float)
+        if len(values) != len(self._knots):
+            raise ValueError(f"Length of {name} must be one more than number of segments.")
+        if values.shape != self._knots[:, row].shape:
+            raise ValueError("All entries must have the same shape (1D, 2D, or 3D).")
+        # Only the knots that actually change get new coefficients and version stamps.
+        changed = np.flatnonzero(np.any(values.reshape(len(values), -1)
+                                        != self._knots[:, row].reshape(len(values), -1), axis=1))
+        if len(changed) == 0:
+            return
+        self._knots[changed, row] = values[changed]
+        self._knots_changed(changed)
 
     @property
     def control_points(self):
-        return [seg.p0 for seg in self.segments] + [self.segments[-1].p1]
+        return list(self._knots[:, 0].copy())
 
     @control_points.setter
     def control_points(self, new_points):
-        if len(new_points) != len(self.segments) + 1:
-            raise ValueError("Length of control points must be one more than number of segments.")
-        for i, seg in enumerate(self.segments):
-            seg.p0 = new_points[i]
-            seg.p1 = new_points[i + 1]
+        self._set_control_row(0, new_points, "control points")
 
     @property
     def control_tangents(self):
-        return [seg.v0 for seg in self.segments] + [self.segments[-1].v1]
+        return list(self._knots[:, 1].copy())
 
     @control_tangents.setter
     def control_tangents(self, new_tangents):
-        if len(new_tangents) != len(self.segments) + 1:
-            raise ValueError("Length of tangents must be one more than number of segments.")
-        for i, seg in enumerate(self.segments):
-            seg.v0 = new_tangents[i]
-            seg.v1 = new_tangents[i + 1]
+        self._set_control_row(1, new_tangents, "tangents")
 
     @property
     def control_curvatures(self):
-        return [seg.a0 for seg in self.segments] + [self.segments[-1].a1]
+        return list(self._knots[:, 2].copy())
 
     @control_curvatures.setter
     def control_curvatures(self, new_curvatures):
-        if len(new_curvatures) != len(self.segments) + 1:
-            raise ValueError("Length of curvatures must be one more than number of segments.")
-        for i, seg in enumerate(self.segments):
-            seg.a0 = new_curvatures[i]
-            seg.a1 = new_curvatures[i + 1]
+        self._set_control_row(2, new_curvatures, "curvatures")
 
     @classmethod
     def from_controls(cls, points, tangents, curvatures):
         if not (len(points) == len(tangents) == len(curvatures)):
             raise ValueError("points, tangents, and curvatures must have the same length")
+        points = np.asarray(points, dtype=float)
+        tangents = np.asarray(tangents, dtype=float)
+        curvatures = np.asarray(curvatures, dtype=float)
+        if not (points.shape == tangents.shape == curvatures.shape) or points.ndim != 2:
+            raise ValueError("All inputs must have the same shape (1D, 2D, or 3D).")
+        obj = cls.__new__(cls)
+        obj._set_knots(np.stack([points, tangents, curvatures], axis=1))
+        return obj
+
+    @classmethod
+    def _from_arrays(cls, knots, coefficients):
+        """
+        Build a spline from knot data and matching, already computed coefficients.
+        """
         obj = cls.__new__(cls)
-        obj.segments = []
-        for i in range(len(points) - 1):
-            seg = QuinticHermiteSegment(
-                points=[points[i], points[i + 1]],
-                tangents=[tangents[i], tangents[i + 1]],
-                curvatures=[curvatures[i], curvatures[i + 1]]
-            )
-            obj.segments.append(seg)
+        obj._set_knots(np.array(knots, dtype=float))
+        obj._coefficients[...] = coefficients
+        obj._dirty[:] = False
+        obj._stale = False
         return obj
 
     @classmethod
@@ -77,56 +222,371 @@ class QuinticHermiteSpline:
                 raise ValueError(f"Segments {i} and {i+1} are not C² continuous.")
 
         obj = cls.__new__(cls)
-        obj.segments = segments
+        obj._set_knots([seg.knots[0] for seg in segments] + [segments[-1].knots[1]])
+        obj._adopt(segments)
         return obj
 
     def add_point(self, point, tangent, curvature, index=None):
+        knot = np.array([point, tangent, curvature], dtype=float)
+        if knot.shape != (3, self.dim):
+            raise ValueError("All entries must have the same shape (1D, 2D, or 3D).")
+        self._invalidate_caches()
         if index is None:
-            last = self.segments[-1]
-            new_segment = QuinticHermiteSegment(
-                points=[last.p1, point],
-                tangents=[last.v1, tangent],
-                curvatures=[last.a1, curvature]
-            )
-            self.segments.append(new_segment)
+            self._knots = np.concatenate([self._knots, knot[None]])
+            self._coefficients = np.concatenate([self._coefficients, np.empty((1, self.dim, 6))])
+            self._dirty = np.append(self._dirty, True)
+            self._segment_versions = np.append(self._segment_versions, next_version(1))
+            self._views.append(None)
         else:
-            if index < 0 or index > len(self.segments):
+            if index < 0 or index >= len(self._views):
                 raise IndexError("Invalid index for insertion.")
             if index == 0:
                 raise ValueError("Cannot insert before the first point.")
-            before_seg = self.segments[index - 1]
-            new_segment = QuinticHermiteSegment(
-                points=[before_seg.p1, point],
-                tangents=[before_seg.v1, tangent],
-                curvatures=[before_seg.a1, curvature]
-            )
-            after_seg = QuinticHermiteSegment(
-                points=[point, self.segments[index].p1],
-                tangents=[tangent, self.segments[index].v1],
-                curvatures=[curvature, self.segments[index].a1]
-            )
-            self.segments = (
-                self.segments[:index] + [new_segment, after_seg] + self.segments[index + 1:]
-            )
-
-    def sample(self, n_points=None):
-        sampled_points = []
+            # Split segment `index` at the new knot; the old view no longer belongs to the spline.
+            if self._views[index] is not None:
+                self._views[index]._detach()
+            self._knots = np.insert(self._knots, index + 1, knot, axis=0)
+            self._coefficients = np.insert(self._coefficients, index + 1, 0.0, axis=0)
+            self._dirty = np.insert(self._dirty, index + 1, True)
+            self._dirty[index] = True
+            self._segment_versions = np.insert(self._segment_versions, index + 1, 0)
+            self._segment_versions[index:index + 2] = next_version(2)
+            self._views = self._views[:index] + [None, None] + self._views[index + 1:]
+            for i, seg in enumerate(self._views[index + 2:], start=index + 2):
+                if seg is not None:
+                    seg._index = i
+        self._stale = True
+
+    def update_controls(self, indices, points=None, tangents=None, curvatures=None):
+        """
+        Move several knots at once. Only the segments touching the given knots are
+        recomputed, in a single batched pass on the next evaluation.
+        :param indices: knot indices, negative values count from the end
+        :param points: optional array of shape (len(indices), dim)
+        :param tangents: optional array of shape (len(indices), dim)
+        :param curvatures: optional array of shape (len(indices), dim)
+        """
+        indices = np.arange(len(self._knots))[np.atleast_1d(np.asarray(indices, dtype=np.intp))]
+        for row, values in enumerate((points, tangents, curvatures)):
+            if values is None:
+                continue
+            values = np.asarray(values, dtype=float)
+            if values.shape != (len(indices), self.dim):
+                raise ValueError("Updated entries must have shape (len(indices), dim).")
+            self._knots[indices, row] = values
+        self._knots_changed(indices)
+
+    def _locate(self, s):
+        """
+        Map global parameters to (segment index, local parameter t).
+        """
+        s = np.asarray(s, dtype=float)
+        breaks = np.arange(self.n_segments + 1, dtype=float)
+        idx = np.clip(np.searchsorted(breaks, s, side='right') - 1, 0, self.n_segments - 1)
+        return idx, s - breaks[idx]
+
+    def evaluate(self, s, workers=None):
+        """
+        Evaluate the spline at global parameter s in [0, n_segments].
+        s may be a scalar or an array of any shape; the result has shape s.shape + (dim,).
+        :param workers: evaluate on a pool of this many processes; inside a `parallel`
+                        block the block's pool is used by default
+        """
+        idx, t = self._locate(s)
+        executor = get_executor(workers)
+        if executor is not None:
+            return executor.evaluate(self._refresh(), idx.ravel(), t.ravel()).reshape(t.shape + (self.dim,))
+        return horner(self._refresh(), t, index=idx)
+
+    def derivative(self, s, order=1):
+        """
+        Evaluate the order-th derivative (1 to 5) with respect to the global parameter s.
+        """
+        if not 1 <= order <= 5:
+            raise ValueError("order must be between 1 and 5.")
+        idx, t = self._locate(s)
+        return horner(derivative_coefficients(self._refresh(), order), t, index=idx)
 
+    def evaluate_all(self, s):
+        """
+        Evaluate position, velocity and acceleration at s in a single Horner pass.
+        """
+        idx, t = self._locate(s)
+        values = horner(derivative_stack(self._refresh(), (0, 1, 2)), t[..., None], index=idx)
+        return values[..., 0, :], values[..., 1, :], values[..., 2, :]
+
+    def _derivatives(self, s, orders):
+        """
+        Derivatives of the given orders at s in a single Horner pass, each of shape s.shape + (dim,).
+        """
+        idx, t = self._locate(s)
+        values = horner(derivative_stack(self._refresh(), orders), t[..., None], index=idx)
+        return [values[..., i, :] for i in range(len(orders))]
+
+    def tangent(self, s):
+        """
+        Unit tangents at s, of shape s.shape + (dim,).
+        """
+        d1, = self._derivatives(s, (1,))
+        return geometry.unit_tangent(d1)
+
+    def normal(self, s):
+        """
+        Unit normals at s. In 2D this is the tangent turned counterclockwise, which keeps one
+        side of the curve throughout; otherwise it is the principal normal, pointing toward
+        the centre of curvature (zero where the curve is straight).
+        """
+        if self.dim == 2:
+            d1, = self._derivatives(s, (1,))
+            return geometry.left_normal(d1)
+        return geometry.principal_normal(*self._derivatives(s, (1, 2)))
+
+    def binormal(self, s):
+        """
+        Unit binormals (tangent x principal normal) of a 3D spline at s.
+        """
+        if self.dim != 3:
+            raise ValueError("binormal requires a 3D spline.")
+        d1, d2 = self._derivatives(s, (1, 2))
+        return geometry.unit_tangent(np.cross(d1, d2))
+
+    def curvature(self, s, signed=False):
+        """
+        Curvature at s. With signed=True (2D only) it is positive where the curve turns
+        counterclockwise, toward normal(s).
+        """
+        d1, d2 = self._derivatives(s, (1, 2))
+        if signed:
+            if self.dim != 2:
+                raise ValueError("signed curvature requires a 2D spline.")
+            return geometry.signed_curvature(d1, d2)
+        return geometry.curvature(d1, d2)
+
+    def torsion(self, s):
+        """
+        Torsion of a 3D spline at s.
+        """
+        if self.dim != 3:
+            raise ValueError("torsion requires a 3D spline.")
+        return geometry.torsion(*self._derivatives(s, (1, 2, 3)))
+
+    def curvature_comb(self, s, scale=1.0):
+        """
+        Curvature comb: teeth from the curve points at s, of length scale x curvature,
+        pointing away from the centre of curvature.
+        Returns: (points, tips), each of shape s.shape + (dim,)
+        """
+        points, d1, d2 = self._derivatives(s, (0, 1, 2))
+        return points, points - scale * geometry.curvature_vector(d1, d2)
+
+    def offset(self, s, distance):
+        """
+        Points of the offset curve of a 2D spline at s, moved by distance along normal(s).
+        :param distance: scalar, array broadcastable against s, or function of s returning one
+        Returns: array of shape s.shape + (2,)
+        """
+        if self.dim != 2:
+            raise ValueError("offset requires a 2D spline.")
+        s = np.asarray(s, dtype=float)
+        if callable(distance):
+            distance = distance(s)
+        points, d1 = self._derivatives(s, (0, 1))
+        return points + np.asarray(distance, dtype=float)[..., None] * geometry.left_normal(d1)
+
+    def thickness_profile(self, s, thickness):
+        """
+        Upper and lower surfaces of a profile with this 2D spline as camber line, half the
+        thickness on either side along normal(s), e.g. an airfoil from its camber line and
+        thickness distribution. Use fit_spline to turn either side back into a spline.
+        :param thickness: scalar, array broadcastable against s, or function of s returning one
+        Returns: (upper, lower), each of shape s.shape + (2,)
+        """
+        if self.dim != 2:
+            raise ValueError("thickness_profile requires a 2D spline.")
+        s = np.asarray(s, dtype=float)
+        if callable(thickness):
+            thickness = thickness(s)
+        half = 0.5 * np.asarray(thickness, dtype=float)[..., None]
+        points, d1 = self._derivatives(s, (0, 1))
+        normal = geometry.left_normal(d1)
+        return points + half * normal, points - half * normal
+
+    def _arc_length_table(self):
+        if self._arc_table is None:
+            self._arc_table = ArcLengthTable(self._refresh())
+        return self._arc_table
+
+    def length(self):
+        """
+        Total arc length of the spline.
+        """
+        return self._arc_length_table().total
+
+    def arc_length(self, s):
+        """
+        Arc length from the start of the spline to global parameter s (scalar or array).
+        """
+        idx, t = self._locate(s)
+        return self._arc_length_table().length_at(idx, t)
+
+    def param_at_length(self, length):
+        """
+        Global parameter s at which the arc length from the start equals `length`.
+        Lengths outside [0, length()] are clipped to the ends of the spline.
+        """
+        idx, t = self._arc_length_table().locate(length)
+        return idx + t
+
+    def sample_uniform_arclength(self, n_points=100):
+        """
+        Sample n_points evenly spaced in arc length, including both end points.
+        """
+        key = (self._version, "arclength", n_points)
+        points = self.sample_cache.get(key)
+        if points is None:
+            points = self.evaluate(self.param_at_length(np.linspace(0, self.length(), n_points)))
+            self.sample_cache.put(key, points)
+        return points
+
+    def _segment_bvh(self):
+        if self._bvh is None:
+            self._bvh = SegmentBVH(self._refresh())
+        return self._bvh
+
+    def bounding_boxes(self):
+        """
+        Exact axis-aligned bounding box of every segment, of shape (n_segments, 2, dim).
+        """
+        return self._segment_bvh().boxes
+
+    def closest_point(self, queries):
+        """
+        Project points onto the spline.
+        :param queries: array of shape (Q, dim)
+        Returns: (s, points, distances) with the global parameter, position and distance
+                 of the closest spline point to each query
+        """
+        seg_ids, t, points, distances = self._segment_bvh().closest_point(queries)
+        return seg_ids + t, points, distances
+
+    def intersect(self, other, tol=1e-9, return_overlaps=False):
+        """
+        Intersections with another spline of the same dimension.
+        Stretches where the splines coincide are reported by their two end points.
+        :param tol: maximum distance between the two spline points of a reported intersection
+        :param return_overlaps: also return the coinciding stretches as a (K, 2, 2) array of
+                                [[s start, s end], [s_other at start, s_other at end]]
+        Returns: (s, s_other, points) with the global parameters on both splines, sorted along this one
+        """
+        if other.dim != self.dim:
+            raise ValueError("Both splines must have the same dimension.")
+        return curve_intersections(self._segment_bvh(), other._segment_bvh(), tol=tol,
+                                   return_overlaps=return_overlaps)
+
+    def intersect_plane(self, point, normal):
+        """
+        Intersections with the plane (a line in 2D) through point with the given normal.
+        Returns: (s, points) sorted along the spline
+        """
+        return plane_intersections(self._refresh(), point, normal)
+
+    def intersect_line(self, point, direction):
+        """
+        Intersections with the infinite line through point along direction (2D only).
+        Returns: (s, points) sorted along the spline
+        """
+        if self.dim != 2:
+            raise ValueError("intersect_line requires a 2D spline; use intersect_plane in 3D.")
+        direction = np.asarray(direction, dtype=float)
+        return self.intersect_plane(point, [-direction[1], direction[0]])
+
+    def solve_for(self, values, axis=0):
+        """
+        Every parameter at which coordinate `axis` equals each of the values, e.g. all points
+        of a 2D profile at given x. The monotone pieces of the coordinate are computed once
+        per geometry and reused until the spline changes.
+        :param values: array of shape (V,)
+        Returns: (value_ids, s) ordered by value then parameter; for a curve monotone in the
+                 axis, value_ids is arange(V) for values within its range, and
+                 evaluate(s)[:, 1 - axis] is the other coordinate of a 2D curve as a function of it
+        """
+        if axis not in self._monotone:
+            self._monotone[axis] = MonotonePieces(self._refresh(), axis)
+        return self._monotone[axis].solve(values)
+
+    def sample(self, n_points=None, tol=None, max_angle=None, workers=None):
+        """
+        Sample the spline segment by segment, biased toward regions of high curvature.
+        :param n_points: total number of points, distributed over the segments by their
+                         end curvature; if None, 100 points are taken on every segment.
+        :param tol: if given (or max_angle is), return instead the adaptive polyline whose
+                    distance from the curve is at most tol; shared knots then appear once.
+        :param max_angle: maximum tangent turning angle across one polyline edge, in radians
+        :param workers: resample changed segments on a pool of this many processes; inside a
+                        `parallel` block the block's pool is used by default
+        Results are cached per (version, mode, n_points) in `sample_cache` and returned read-only.
+        """
+        if tol is not None or max_angle is not None:
+            key = (self._version, "adaptive", (tol, max_angle))
+            points = self.sample_cache.get(key)
+            if points is None:
+                points = adaptive_sample(self._refresh(), tol=tol, max_angle=max_angle)
+                self.sample_cache.put(key, points)
+            return points
+
+        key = (self._version, "curvature", n_points)
+        points = self.sample_cache.get(key)
+        if points is not None:
+            return points
+
+        points = self._tessellation.update(self._refresh(), self._segment_versions, self._points_per_segment(n_points),
+                                           executor=get_executor(workers)).copy()
+        self.sample_cache.put(key, points)
+        return points
+
+    def _points_per_segment(self, n_points=None):
+        """
+        Number of points sample(n_points) takes on each segment.
+        """
         if n_points is None:
             # Default: uniform number of points per segment
-            for seg in self.segments:
-                sampled_points.extend(seg.sample(n_points=100))
+            return np.full(self.n_segments, 100)
+        # Distribute n_points based on segment curvature
+        norms = np.linalg.norm(self._knots[:, 2], axis=1)
+        curvatures = np.maximum(norms[:-1], norms[1:])
+        total_curvature = curvatures.sum()
+        if total_curvature == 0:
+            weights = np.full(self.n_segments, 1 / self.n_segments)
         else:
-            # Distribute n_points based on segment curvature
-            curvatures = [np.max(np.linalg.norm([seg.a0, seg.a1], axis=1)) for seg in self.segments]
-            total_curvature = sum(curvatures)
-            if total_curvature == 0:
-                weights = [1 / len(self.segments)] * len(self.segments)
-            else:
-                weights = [c / total_curvature for c in curvatures]
-
-            points_per_seg = [max(2, int(round(w * n_points))) for w in weights]
-            for seg, pts in zip(self.segments, points_per_seg):
-                sampled_points.extend(seg.sample(n_points=pts))
-
-        return np.array(sampled_points)
+            weights = curvatures / total_curvature
+        return np.maximum(2, np.round(weights * n_points).astype(int))
+
+    def sample_count(self, n_points=None):
+        """
+        Number of points returned by sample(n_points), e.g. to allocate a buffer for sample_into.
+        """
+        return int(self._points_per_segment(n_points).sum())
+
+    def iter_samples(self, n_points=None, chunk_size=None):
+        """
+        Stream the points of sample(n_points) without building the whole array or caching it.
+        :param chunk_size: points per yielded block; if None, one block per segment
+        Yields: arrays of shape (chunk, dim)
+        """
+        return iter_curvature_weighted_sample(self._refresh(), self._points_per_segment(n_points), chunk_size)
+
+    def sample_into(self, out, n_points=None, chunk_size=1 << 20):
+        """
+        Write the points of sample(n_points) into a preallocated (or memory-mapped) array,
+        chunk_size points at a time.
+        :param out: array of shape (sample_count(n_points), dim)
+        Returns: out
+        """
+        shape = (self.sample_count(n_points), self.dim)
+        if out.shape != shape:
+            raise ValueError(f"out must have shape {shape}, got {out.shape}.")
+        start = 0
+        for chunk in self.iter_samples(n_points, chunk_size):
+            out[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        return out
@@ -0,0 +1,297 @@
+"""
+Tensor-product quintic Hermite surfaces.
+
+Every patch is the product of QuinticHermiteSegment's basis along u and along v, so iso-lines
+through the nodes are QuinticHermiteSplines, and lofting a stack of sections reproduces them.
+"""
+import numpy as np
+from .polynomial import power_basis, reparametrize, to_bernstein
+from .profiling import instrumented
+from .quintic_hermite_segment import _HERMITE_BASIS
+from .spline_batch import SplineBatch
+
+# Pairs evaluated per block in QuinticHermiteSurface.evaluate, bounding the gathered coefficients.
+_BLOCK_PAIRS = 1 << 16
+# Cells whose Bezier nets are checked per block during tessellation.
+_BLOCK_CELLS = 1 << 14
+
+
+def surface_coefficients(nodes):
+    """
+    Biquintic coefficients of every patch of a grid of Hermite nodes.
+    :param nodes: array of shape (n_u, n_v, 3, 3, dim); nodes[a, b, i, j] combines the i-th
+                  end condition along u with the j-th along v at grid node (a, b)
+    Returns: array of shape (n_u - 1, n_v - 1, dim, 6, 6); entry [..., k, l] multiplies u^k v^l
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    # End conditions of each patch: u-rows [i at u=0, i at u=1], v-columns likewise.
+    conditions = np.concatenate([
+        np.concatenate([nodes[:-1, :-1], nodes[:-1, 1:]], axis=3),
+        np.concatenate([nodes[1:, :-1], nodes[1:, 1:]], axis=3),
+    ], axis=2)
+    conditions = np.moveaxis(conditions, -1, 2)
+    return _HERMITE_BASIS @ conditions @ _HERMITE_BASIS.T
+
+
+def _locate(s, n_patches):
+    s = np.asarray(s, dtype=float)
+    idx = np.clip(np.floor(s).astype(np.intp), 0, n_patches - 1)
+    return idx, s - idx
+
+
+def _bezier_maps(lo, hi):
+    """
+    Matrices M, one per interval [lo, hi] of local parameters, such that c @ M are the
+    Bernstein coefficients over that interval of the quintic with monomial coefficients c.
+    Returns: array of shape (len(lo), 6, 6)
+    """
+    return to_bernstein(reparametrize(np.eye(6), lo[:, None], hi[:, None]))
+
+
+def _largest_norm(points):
+    """
+    Length of the longest of the 6 x 6 vectors in each (dim, 6, 6) block of points.
+    """
+    return np.sqrt(np.einsum('pdkl,pdkl->pkl', points, points).max(axis=(1, 2)))
+
+
+def _flatness(nets):
+    """
+    Upper bound on the distance between each sub-patch and its two corner triangles, with the
+    part of it explained by curvature along u and along v separately.
+    :param nets: array of shape (N, dim, 6, 6)
+    Returns: (bound, along_u, along_v), each of shape (N,)
+    """
+    w = np.linspace(0, 1, 6)
+    first_u, last_u = nets[..., :1, :], nets[..., -1:, :]
+    first_v, last_v = nets[..., :, :1], nets[..., :, -1:]
+    along_u = _largest_norm(nets - first_u - w[:, None] * (last_u - first_u))
+    along_v = _largest_norm(nets - first_v - w[None, :] * (last_v - first_v))
+    bilinear = first_v + w[None, :] * (last_v - first_v)
+    bilinear = bilinear[..., :1, :] + w[:, None] * (bilinear[..., -1:, :] - bilinear[..., :1, :])
+    twist = nets[..., 0, 0] + nets[..., -1, -1] - nets[..., 0, -1] - nets[..., -1, 0]
+    bound = _largest_norm(nets - bilinear) + np.linalg.norm(twist, axis=1) / 4
+    return bound, along_u, along_v
+
+
+def _halve(breaks, split):
+    """
+    Insert the midpoints of the split intervals. Returns: (breaks, whether each interval is new)
+    """
+    counts = np.where(split, 2, 1)
+    starts = np.repeat(breaks[:-1], counts)
+    widths = np.repeat(np.diff(breaks) / counts, counts)
+    offset = np.arange(len(starts)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.append(starts + offset * widths, breaks[-1]), np.repeat(split, counts)
+
+
+class QuinticHermiteSurface:
+    """
+    Tensor-product quintic Hermite surface over a grid of nodes.
+
+    Node (a, b) holds a 3 x 3 block of end conditions: entry [i, j] is the i-th of
+    QuinticHermiteSegment's [point, tangent, curvature] conditions along u applied to the j-th
+    along v, so [1, 1] is the twist x_uv. Patch (a, b) covers u in [a, a + 1], v in [b, b + 1],
+    and along every iso-line the surface is a QuinticHermiteSpline of the matching node rows.
+    """
+    def __init__(self, nodes):
+        """
+        :param nodes: array of shape (n_u, n_v, 3, 3, dim) of end conditions, see surface_coefficients
+        """
+        nodes = np.ascontiguousarray(nodes, dtype=float)
+        if nodes.ndim != 5 or nodes.shape[2:4] != (3, 3) or min(nodes.shape[:2]) < 2:
+            raise ValueError("nodes must have shape (n_u, n_v, 3, 3, dim) with n_u, n_v >= 2.")
+        self._nodes = nodes
+        self.dim = nodes.shape[-1]
+        self._coefficients = surface_coefficients(nodes)
+
+    @classmethod
+    def from_derivatives(cls, points, du, dv, duv=None, duu=None, dvv=None,
+                         duuv=None, duvv=None, duuvv=None):
+        """
+        Build a surface from a grid of points and partial derivatives, each of shape (n_u, n_v, dim).
+        The second-order terms (duu, dvv and the mixed terms containing them) are curvature
+        conditions as in QuinticHermiteSegment. Derivatives that are not given are taken as zero.
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 3:
+            raise ValueError("points must have shape (n_u, n_v, dim).")
+        nodes = np.zeros(points.shape[:2] + (3, 3) + points.shape[2:])
+        for (i, j), values in {(0, 0): points, (1, 0): du, (0, 1): dv, (1, 1): duv, (2, 0): duu,
+                               (0, 2): dvv, (2, 1): duuv, (1, 2): duvv, (2, 2): duuvv}.items():
+            if values is not None:
+                values = np.asarray(values, dtype=float)
+                if values.shape != points.shape:
+                    raise ValueError("All derivative grids must have the same shape as points.")
+                nodes[:, :, i, j] = values
+        return cls(nodes)
+
+    @classmethod
+    def loft(cls, sections):
+        """
+        Loft through a stack of compatible sections: QuinticHermiteSplines with the same number
+        of segments and dimension, or a SplineBatch. u runs along the sections and section b
+        lies at v = b. The sections' points, tangents and curvatures are kept exactly; the
+        derivatives across sections come from second-order finite differences.
+        """
+        if not isinstance(sections, SplineBatch):
+            sections = list(sections)
+        if len(sections) < 2:
+            raise ValueError("At least two sections must be provided.")
+        if isinstance(sections, SplineBatch):
+            knots = np.asarray(sections.knots)
+        else:
+            shape = sections[0].knots.shape
+            if any(section.knots.shape != shape for section in sections):
+                raise ValueError("All sections must have the same number of segments and dimension.")
+            knots = np.stack([section.knots for section in sections])
+        edge_order = 2 if len(knots) >= 3 else 1
+        across = np.gradient(knots, axis=0, edge_order=edge_order)
+        across2 = np.gradient(across, axis=0, edge_order=edge_order)
+        # (section, knot, i, dim) -> (knot, section, i, j, dim)
+        nodes = np.stack([knots, across, across2], axis=3)
+        return cls(np.swapaxes(nodes, 0, 1))
+
+    @property
+    def nodes(self):
+        """
+        Read-only node data of shape (n_u, n_v, 3, 3, dim).
+        """
+        nodes = self._nodes.view()
+        nodes.flags.writeable = False
+        return nodes
+
+    @property
+    def coefficients(self):
+        """
+        Read-only patch coefficients of shape (n_u - 1, n_v - 1, dim, 6, 6).
+        """
+        coefficients = self._coefficients.view()
+        coefficients.flags.writeable = False
+        return coefficients
+
+    @property
+    def shape(self):
+        """
+        Number of patches along u and v.
+        """
+        return self._coefficients.shape[:2]
+
+    @instrumented("surface.evaluate")
+    def evaluate(self, u, v, du=0, dv=0):
+        """
+        Evaluate the surface, or its (du, dv) partial derivative, at (u, v) pairs.
+        u and v broadcast against each other; the result has shape broadcast(u, v).shape + (dim,).
+        """
+        u, v = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(v, dtype=float))
+        iu, tu = _locate(u.ravel(), self.shape[0])
+        iv, tv = _locate(v.ravel(), self.shape[1])
+        patches = self._coefficients.reshape((-1,) + self._coefficients.shape[2:])
+        patch = iu * self.shape[1] + iv
+        out = np.empty((u.size, self.dim))
+        for start in range(0, u.size, _BLOCK_PAIRS):
+            block = slice(start, start + _BLOCK_PAIRS)
+            along_u = np.einsum('pdkl,pl->pdk', patches[patch[block]], power_basis(tv[block], order=dv))
+            out[block] = np.einsum('pdk,pk->pd', along_u, power_basis(tu[block], order=du))
+        return out.reshape(u.shape + (self.dim,))
+
+    @instrumented("surface.evaluate_grid")
+    def evaluate_grid(self, u, v, du=0, dv=0):
+        """
+        Evaluate the surface, or its (du, dv) partial derivative, on the grid u x v.
+        :param u, v: 1D arrays of parameters
+        Returns: array of shape (len(u), len(v), dim)
+        """
+        u = np.asarray(u, dtype=float)
+        v = np.asarray(v, dtype=float)
+        iu, tu = _locate(u, self.shape[0])
+        iv, tv = _locate(v, self.shape[1])
+        ub = power_basis(tu, order=du)
+        vb = power_basis(tv, order=dv)
+        # Contract u first, one patch row at a time: partial[m] holds v-polynomials of every patch column.
+        partial = np.empty((len(u), self.shape[1], self.dim, 6))
+        for row in np.unique(iu):
+            rows = np.flatnonzero(iu == row)
+            partial[rows] = np.einsum('mk,pdkl->mpdl', ub[rows], self._coefficients[row])
+        out = np.empty((len(u), len(v), self.dim))
+        for column in np.unique(iv):
+            columns = np.flatnonzero(iv == column)
+            out[:, columns] = np.einsum('mdl,nl->mnd', partial[:, column], vb[columns])
+        return out
+
+    def normals(self, u, v, grid=False):
+        """
+        Unit normals (x_u cross x_v) of a 3D surface at (u, v) pairs, or on the grid u x v.
+        """
+        if self.dim != 3:
+            raise ValueError("normals require a 3D surface.")
+        evaluate = self.evaluate_grid if grid else self.evaluate
+        normal = np.cross(evaluate(u, v, du=1), evaluate(u, v, dv=1))
+        length = np.linalg.norm(normal, axis=-1, keepdims=True)
+        return np.divide(normal, length, out=np.zeros_like(normal), where=length > 0)
+
+    def _split_intervals(self, u_breaks, v_breaks, fresh_u, fresh_v, tol):
+        """
+        Intervals of the rectilinear grid to halve so that every cell gets within tol.
+        Only cells with a fresh u or v interval are checked; the others passed before.
+        """
+        n_u, n_v = len(u_breaks) - 1, len(v_breaks) - 1
+        split_u = np.zeros(n_u, dtype=bool)
+        split_v = np.zeros(n_v, dtype=bool)
+        iu = np.minimum(np.floor(u_breaks[:-1]).astype(np.intp), self.shape[0] - 1)
+        iv = np.minimum(np.floor(v_breaks[:-1]).astype(np.intp), self.shape[1] - 1)
+        to_u = np.swapaxes(_bezier_maps(u_breaks[:-1] - iu, u_breaks[1:] - iu), -1, -2)
+        to_v = _bezier_maps(v_breaks[:-1] - iv, v_breaks[1:] - iv)
+        rows_per_block = max(1, _BLOCK_CELLS // n_v)
+        for first in range(0, n_u, rows_per_block):
+            rows = np.arange(first, min(first + rows_per_block, n_u))[:, None]
+            columns = np.arange(n_v)[None, :]
+            rows, columns = np.broadcast_arrays(rows, columns)
+            rows, columns = rows.ravel(), columns.ravel()
+            check = fresh_u[rows] | fresh_v[columns]
+            rows, columns = rows[check], columns[check]
+            nets = to_u[rows, None] @ self._coefficients[iu[rows], iv[columns]] @ to_v[columns, None]
+            bound, along_u, along_v = _flatness(nets)
+            bad = bound > tol
+            by_u = bad & (along_u > tol / 2)
+            by_v = bad & (along_v > tol / 2)
+            both = bad & ~by_u & ~by_v
+            split_u[rows[by_u | both]] = True
+            split_v[columns[by_v | both]] = True
+        return split_u, split_v
+
+    @instrumented("surface.tessellate", points=lambda result: len(result[0]))
+    def tessellate(self, tol=1e-3, max_vertices=10 ** 6, min_width=1e-6):
+        """
+        Triangle mesh within tol of the surface, on a rectilinear (u, v) grid refined where needed.
+        The grid starts at the patch boundaries and intervals are halved until every cell's
+        Bezier net shows the cell to be within tol of its two triangles, so the mesh has no
+        cracks and meets tol by construction (unless max_vertices or min_width stop it first).
+        Returns: (vertices (V, dim), triangles (T, 3) vertex indices, uv (V, 2) parameters)
+        """
+        u_breaks = np.arange(self.shape[0] + 1, dtype=float)
+        v_breaks = np.arange(self.shape[1] + 1, dtype=float)
+        fresh_u = np.ones(len(u_breaks) - 1, dtype=bool)
+        fresh_v = np.ones(len(v_breaks) - 1, dtype=bool)
+        while True:
+            split_u, split_v = self._split_intervals(u_breaks, v_breaks, fresh_u, fresh_v, tol)
+            split_u &= np.diff(u_breaks) > min_width
+            split_v &= np.diff(v_breaks) > min_width
+            grown = (len(u_breaks) + split_u.sum()) * (len(v_breaks) + split_v.sum())
+            if not (split_u.any() or split_v.any()) or grown > max_vertices:
+                break
+            u_breaks, fresh_u = _halve(u_breaks, split_u)
+            v_breaks, fresh_v = _halve(v_breaks, split_v)
+
+        vertices = self.evaluate_grid(u_breaks, v_breaks)
+        n_u, n_v = len(u_breaks), len(v_breaks)
+        corner = (np.arange(n_u - 1)[:, None] * n_v + np.arange(n_v - 1)[None, :]).ravel()
+        a, b, c, d = corner, corner + n_v, corner + n_v + 1, corner + 1
+        # Split each cell along its shorter diagonal.
+        flat = vertices.reshape(-1, self.dim)
+        short_ac = np.linalg.norm(flat[a] - flat[c], axis=1) <= np.linalg.norm(flat[b] - flat[d], axis=1)
+        first = np.where(short_ac[:, None], np.stack([a, b, c], 1), np.stack([a, b, d], 1))
+        second = np.where(short_ac[:, None], np.stack([a, c, d], 1), np.stack([b, c, d], 1))
+        triangles = np.stack([first, second], axis=1).reshape(-1, 3)
+        uv = np.stack(np.meshgrid(u_breaks, v_breaks, indexing='ij'), axis=-1).reshape(-1, 2)
+        return flat, triangles, uv
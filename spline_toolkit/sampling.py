@@ -0,0 +1,308 @@
+"""
+Batched sampling engine for quintic Hermite segments.
+
+All functions operate on coefficient tensors of shape (N, dim, 6) so that a single segment,
+a whole spline and a batch of splines share one code path.
+"""
+import numpy as np
+from .polynomial import derivative_coefficients, horner, power_basis, reparametrize, to_bernstein
+from .profiling import instrumented, timed
+
+# High-resolution grid used to build the curvature CDF of each segment.
+_HIGH_RES = 500
+_T_HR = np.linspace(0, 1, _HIGH_RES)
+# Monomial derivative matrices on the grid: (d/dt)^k [1, t, ..., t^5] for k = 1, 2.
+_T1_HR = power_basis(_T_HR, order=1)
+_T2_HR = power_basis(_T_HR, order=2)
+# Segments processed per block, bounding the size of the (block, dim, 500) derivative arrays.
+_BLOCK_SEGMENTS = 1024
+
+
+def curvature_magnitude(d1, d2):
+    """
+    Curvature magnitude from first and second derivatives of shape (..., dim).
+    For 2D/3D: ||x'(t) × x''(t)|| / ||x'(t)||^3
+    For 1D: curvature is zero.
+    """
+    d1 = np.asarray(d1, dtype=float)
+    d2 = np.asarray(d2, dtype=float)
+    dim = d1.shape[-1]
+    if dim == 1:
+        return np.zeros(d1.shape[:-1])
+    if dim == 2:
+        # Cross product in 2D is scalar
+        num = np.abs(d1[..., 0] * d2[..., 1] - d1[..., 1] * d2[..., 0])
+    else:
+        num = np.linalg.norm(np.cross(d1, d2), axis=-1)
+    denom = np.linalg.norm(d1, axis=-1) ** 3 + 1e-8
+    return num / denom
+
+
+@instrumented("sampling.curvature_scan")
+def _curvature_cdf(coefficients):
+    """
+    Curvature-weighted CDF of each segment on the high-resolution grid.
+    :param coefficients: array of shape (N, dim, 6)
+    Returns: array of shape (N, _HIGH_RES)
+    """
+    d1 = np.swapaxes(coefficients @ _T1_HR.T, -1, -2)
+    d2 = np.swapaxes(coefficients @ _T2_HR.T, -1, -2)
+    curvatures = curvature_magnitude(d1, d2)
+    # Add a small baseline so straight regions still get sampled
+    peak = curvatures.max(axis=1, keepdims=True)
+    weights = curvatures + np.where(peak > 0, 0.01 * peak, 1.0)
+    cdf = np.cumsum(weights, axis=1)
+    return cdf / cdf[:, -1:]
+
+
+def _inverse_cdf(cdf, seg_ids, u):
+    """
+    Vectorized equivalent of np.interp(u, cdf[seg], _T_HR) for each (seg, u) pair.
+    """
+    # Binary search for the number of grid CDF values <= u within each row.
+    lo = np.zeros(len(u), dtype=np.intp)
+    hi = np.full(len(u), _HIGH_RES, dtype=np.intp)
+    while np.any(lo < hi):
+        mid = (lo + hi) // 2
+        below = cdf[seg_ids, np.minimum(mid, _HIGH_RES - 1)] <= u
+        active = lo < hi
+        lo = np.where(active & below, mid + 1, lo)
+        hi = np.where(active & ~below, mid, hi)
+    j = np.clip(lo - 1, 0, _HIGH_RES - 2)
+    x0, x1 = cdf[seg_ids, j], cdf[seg_ids, j + 1]
+    t = _T_HR[j] + (u - x0) * (_T_HR[j + 1] - _T_HR[j]) / (x1 - x0)
+    t = np.where(lo == 0, 0.0, t)
+    return np.where(lo == _HIGH_RES, 1.0, t)
+
+
+def _unit_linspaces(counts):
+    """
+    Concatenation of np.linspace(0, 1, n) for every n in counts, with the owning row of each value.
+    """
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    seg_ids = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(offsets[-1]) - offsets[seg_ids]
+    n = counts[seg_ids]
+    u = local * (1.0 / np.maximum(n - 1, 1))
+    u[(local == n - 1) & (n > 1)] = 1.0
+    return seg_ids, u
+
+
+@instrumented("sampling.curvature_weighted", points=lambda result: len(result[1]))
+def curvature_weighted_params(coefficients, n_points):
+    """
+    Local parameters biased toward regions of high curvature, for every segment at once.
+    :param coefficients: array of shape (N, dim, 6)
+    :param n_points: number of points per segment, an int or an array of shape (N,)
+    Returns: (seg_ids, t), each of shape (sum(n_points),), ordered segment by segment
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    counts = np.broadcast_to(np.asarray(n_points, dtype=np.intp), (len(coefficients),))
+    seg_ids, u = _unit_linspaces(counts)
+    t = np.empty_like(u)
+    for first in range(0, len(coefficients), _BLOCK_SEGMENTS):
+        last = min(first + _BLOCK_SEGMENTS, len(coefficients))
+        start, stop = np.searchsorted(seg_ids, [first, last])
+        cdf = _curvature_cdf(coefficients[first:last])
+        t[start:stop] = _inverse_cdf(cdf, seg_ids[start:stop] - first, u[start:stop])
+    return seg_ids, t
+
+
+def iter_curvature_weighted_sample(coefficients, n_points, chunk_size=None):
+    """
+    Generator over the points of curvature_weighted_sample, without building the whole result.
+    :param coefficients: array of shape (N, dim, 6)
+    :param n_points: number of points per segment, an int or an array of shape (N,)
+    :param chunk_size: points per yielded block; if None, one block per segment
+    Yields: arrays of shape (chunk, dim) that concatenate to curvature_weighted_sample's result
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    counts = np.broadcast_to(np.asarray(n_points, dtype=np.intp), (len(coefficients),))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    if chunk_size is None:
+        bounds = offsets[np.concatenate([[True], counts > 0])]
+    else:
+        bounds = np.append(np.arange(0, offsets[-1], chunk_size), offsets[-1])
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        with timed("sampling.stream", points=stop - start):
+            # Local parameters of the global point indices [start, stop), as in _unit_linspaces.
+            seg_ids = np.searchsorted(offsets, np.arange(start, stop), side='right') - 1
+            local = np.arange(start, stop) - offsets[seg_ids]
+            n = counts[seg_ids]
+            u = local * (1.0 / np.maximum(n - 1, 1))
+            u[(local == n - 1) & (n > 1)] = 1.0
+            t = np.empty_like(u)
+            for first in range(seg_ids[0], seg_ids[-1] + 1, _BLOCK_SEGMENTS):
+                last = min(first + _BLOCK_SEGMENTS, seg_ids[-1] + 1)
+                lo, hi = np.searchsorted(seg_ids, [first, last])
+                cdf = _curvature_cdf(coefficients[first:last])
+                t[lo:hi] = _inverse_cdf(cdf, seg_ids[lo:hi] - first, u[lo:hi])
+            chunk = horner(coefficients, t, index=seg_ids)
+        yield chunk
+
+
+def curvature_weighted_sample(coefficients, n_points):
+    """
+    Sample points along every segment, biased toward regions of high curvature.
+    :param coefficients: array of shape (N, dim, 6)
+    :param n_points: number of points per segment, an int or an array of shape (N,)
+    Returns: array of shape (sum(n_points), dim), segment by segment
+    """
+    seg_ids, t = curvature_weighted_params(coefficients, n_points)
+    return horner(coefficients, t, index=seg_ids)
+
+
+def _turning_angle(d0, d1):
+    """
+    Angle between two direction vectors of shape (..., dim); zero where either vanishes.
+    """
+    if d0.shape[-1] == 1:
+        return np.where(d0[..., 0] * d1[..., 0] < 0, np.pi, 0.0)
+    if d0.shape[-1] == 2:
+        cross = np.abs(d0[..., 0] * d1[..., 1] - d0[..., 1] * d1[..., 0])
+    else:
+        cross = np.linalg.norm(np.cross(d0, d1), axis=-1)
+    return np.arctan2(cross, np.sum(d0 * d1, axis=-1))
+
+
+def _interval_errors(coefficients, seg_ids, a, b):
+    """
+    Upper bounds on the chord deviation and tangent turning angle of the sub-intervals
+    [a, b] of segments seg_ids, from the Bezier control points of each piece: the piece lies
+    in their convex hull and its tangents in the cone of its hodograph's control points.
+    """
+    local = reparametrize(coefficients[seg_ids], a[:, None], b[:, None])
+    ctrl = np.swapaxes(to_bernstein(local), -1, -2)
+    x0, x1 = ctrl[:, :1], ctrl[:, -1:]
+    chord = x1 - x0
+    chord_sq = np.sum(chord * chord, axis=-1)
+    # Distance from each inner control point to the chord segment x0 -> x1.
+    w = np.sum((ctrl[:, 1:-1] - x0) * chord, axis=-1)
+    w = np.clip(np.divide(w, chord_sq, out=np.zeros_like(w), where=chord_sq > 0), 0.0, 1.0)
+    deviation = np.linalg.norm(ctrl[:, 1:-1] - x0 - w[..., None] * chord, axis=-1).max(axis=1)
+
+    hodograph = np.swapaxes(to_bernstein(derivative_coefficients(local, 1)), -1, -2)
+    i, j = np.triu_indices(hodograph.shape[1], k=1)
+    angle = _turning_angle(hodograph[:, i], hodograph[:, j]).max(axis=1)
+    return deviation, angle
+
+
+@instrumented("sampling.adaptive", points=lambda result: len(result[1]))
+def adaptive_params(coefficients, tol=None, max_angle=None, min_width=1e-6):
+    """
+    Subdivide every segment until each piece is within tolerance of its chord.
+    :param coefficients: array of shape (N, dim, 6)
+    :param tol: maximum distance between the curve and the polyline (None to ignore)
+    :param max_angle: maximum tangent turning angle across one piece, in radians (None to ignore)
+    :param min_width: pieces narrower than this in t are never split further
+    Returns: (seg_ids, t) of the polyline vertices, ordered along the run; shared segment
+             ends appear once and the run's end point (N - 1, 1.0) is included.
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    n = len(coefficients)
+    seg_ids = np.arange(n)
+    a, b = np.zeros(n), np.ones(n)
+    done_seg, done_a = [], []
+    while len(seg_ids):
+        deviation, angle = _interval_errors(coefficients, seg_ids, a, b)
+        split = np.zeros(len(seg_ids), dtype=bool)
+        if tol is not None:
+            split |= deviation > tol
+        if max_angle is not None:
+            split |= angle > max_angle
+        split &= (b - a) > min_width
+        done_seg.append(seg_ids[~split])
+        done_a.append(a[~split])
+        mid = (a[split] + b[split]) / 2
+        seg_ids = np.repeat(seg_ids[split], 2)
+        a = np.stack([a[split], mid], axis=1).ravel()
+        b = np.stack([mid, b[split]], axis=1).ravel()
+    seg_ids = np.concatenate(done_seg + [[n - 1]]).astype(np.intp)
+    t = np.concatenate(done_a + [[1.0]])
+    order = np.lexsort((t, seg_ids))
+    return seg_ids[order], t[order]
+
+
+def adaptive_sample(coefficients, tol=None, max_angle=None):
+    """
+    Error-bounded polyline through every segment; see adaptive_params.
+    Returns: array of shape (n_vertices, dim)
+    """
+    seg_ids, t = adaptive_params(coefficients, tol=tol, max_angle=max_angle)
+    return horner(coefficients, t, index=seg_ids)
+
+
+def _ranges(starts, counts):
+    """
+    Concatenation of np.arange(start, start + count) for every (start, count) pair.
+    """
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    rows = np.repeat(np.arange(len(counts)), counts)
+    return np.asarray(starts)[rows] + np.arange(offsets[-1]) - offsets[rows]
+
+
+class PolylineBuffer:
+    """
+    Persistent curvature-weighted polyline of a run of segments.
+
+    Each buffered segment is identified by its version stamp. `update` reuses the points of
+    every segment whose stamp and point count are unchanged and resamples the rest in one
+    batch, writing them in place when the layout is unchanged.
+    """
+    def __init__(self, dim):
+        self.points = np.empty((0, dim))
+        self.offsets = np.zeros(1, dtype=np.intp)
+        self.versions = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.intp)
+
+    def segment_range(self, i):
+        """
+        Slice of `points` holding segment i.
+        """
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def update(self, coefficients, versions, counts, executor=None):
+        """
+        Bring the buffer in line with the given segments.
+        :param coefficients: array of shape (N, dim, 6)
+        :param versions: version stamp of each segment, shape (N,)
+        :param counts: number of points per segment, shape (N,)
+        :param executor: optional parallel.ParallelExecutor used to resample stale segments
+        Returns: the buffered points, shape (sum(counts), dim)
+        """
+        return self._update(coefficients, versions, counts, executor)[0]
+
+    @instrumented("sampling.polyline_update", points=lambda result: result[1])
+    def _update(self, coefficients, versions, counts, executor):
+        """
+        Body of update. Returns: (buffered points, number of points resampled)
+        """
+        versions = np.asarray(versions, dtype=np.int64)
+        counts = np.broadcast_to(np.asarray(counts, dtype=np.intp), versions.shape)
+        if len(versions) == len(self.versions) and np.array_equal(counts, self.counts):
+            # Same layout: overwrite the changed segments in place.
+            stale = np.flatnonzero(versions != self.versions)
+        else:
+            # Layout changed: move reusable segments to their new offsets.
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            order = np.argsort(self.versions)
+            pos = np.clip(np.searchsorted(self.versions[order], versions), 0, max(len(order) - 1, 0))
+            old = order[pos] if len(order) else np.zeros(len(versions), dtype=np.intp)
+            reuse = np.zeros(len(versions), dtype=bool)
+            if len(order):
+                reuse = (self.versions[old] == versions) & (self.counts[old] == counts)
+            points = np.empty((offsets[-1], self.points.shape[1]))
+            points[_ranges(offsets[:-1][reuse], counts[reuse])] = \
+                self.points[_ranges(self.offsets[old[reuse]], counts[reuse])]
+            self.points, self.offsets, self.counts = points, offsets, counts.copy()
+            stale = np.flatnonzero(~reuse)
+        resampled = int(counts[stale].sum())
+        if len(stale):
+            if executor is not None:
+                fresh = executor.sample(coefficients[stale], counts[stale])
+            else:
+                seg_ids, t = curvature_weighted_params(coefficients[stale], counts[stale])
+                fresh = horner(coefficients[stale], t, index=seg_ids)
+            self.points[_ranges(self.offsets[stale], counts[stale])] = fresh
+        self.versions = versions.copy()
+        return self.points, resampled
@@ -0,0 +1,171 @@
+"""
+Exact segment bounding boxes, a bounding-volume hierarchy over them, and closest-point projection.
+
+The hierarchy groups segments in curve order: node j of level L covers segments
+[j * 2**L, (j + 1) * 2**L). Consecutive segments of a curve are spatially adjacent, so this
+gives tight nodes without any sorting, and the whole tree is built in O(N) array operations.
+"""
+import numpy as np
+from .polynomial import derivative_coefficients, derivative_stack, horner, power_basis, real_roots
+from .profiling import instrumented
+
+# Coarse grid used to seed the Newton projection on each candidate segment.
+_GRID = np.linspace(0, 1, 17)
+_GRID_BASIS = power_basis(_GRID)
+
+
+@instrumented("spatial.bounding_boxes")
+def bounding_boxes(coefficients):
+    """
+    Exact axis-aligned bounding boxes of segments, from the roots of the derivative polynomials.
+    :param coefficients: array of shape (N, dim, 6)
+    Returns: array of shape (N, 2, dim) holding [min corner, max corner] per segment
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    n, dim = coefficients.shape[:2]
+    flat = coefficients.reshape(n * dim, -1)
+    start, end = flat[:, 0], flat.sum(axis=1)
+    lo, hi = np.minimum(start, end), np.maximum(start, end)
+    ids, roots = real_roots(derivative_coefficients(flat, 1))
+    values = np.sum(flat[ids] * power_basis(roots, m=flat.shape[1]), axis=1)
+    np.minimum.at(lo, ids, values)
+    np.maximum.at(hi, ids, values)
+    return np.stack([lo.reshape(n, dim), hi.reshape(n, dim)], axis=1)
+
+
+def _box_distance_sq(queries, boxes):
+    """
+    Squared distance from points (..., dim) to boxes (..., 2, dim); zero inside the box.
+    """
+    gap = np.maximum(boxes[..., 0, :] - queries, 0.0) + np.maximum(queries - boxes[..., 1, :], 0.0)
+    return np.einsum('...i,...i->...', gap, gap)
+
+
+def _box_minmax_distance_sq(queries, boxes):
+    """
+    Squared MINMAXDIST from points (..., dim) to boxes (..., 2, dim): the smallest distance
+    that is guaranteed to reach some point of the curve inside the box. Valid because the
+    boxes are exact, so every face of a box touches the curve.
+    """
+    mid = 0.5 * (boxes[..., 0, :] + boxes[..., 1, :])
+    near = np.where(queries <= mid, boxes[..., 0, :], boxes[..., 1, :])
+    far = np.where(queries >= mid, boxes[..., 0, :], boxes[..., 1, :])
+    near_sq, far_sq = (queries - near) ** 2, (queries - far) ** 2
+    return np.min(far_sq.sum(axis=-1)[..., None] - far_sq + near_sq, axis=-1)
+
+
+class SegmentBVH:
+    """
+    Bounding-volume hierarchy over the segments of a curve, in curve order.
+    """
+    @instrumented("spatial.bvh_build")
+    def __init__(self, coefficients):
+        """
+        :param coefficients: array of shape (N, dim, 6)
+        """
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        boxes = bounding_boxes(self.coefficients)
+        self.levels = [boxes]
+        while len(self.levels[-1]) > 1:
+            below = self.levels[-1]
+            if len(below) % 2:
+                below = np.concatenate([below, below[-1:]])
+            pairs = below.reshape(-1, 2, 2, below.shape[-1])
+            self.levels.append(np.stack([pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)], axis=1))
+
+    @property
+    def boxes(self):
+        """
+        Segment bounding boxes of shape (N, 2, dim).
+        """
+        return self.levels[0]
+
+    def candidates(self, queries):
+        """
+        Segments that may contain the closest curve point of each query.
+        :param queries: array of shape (Q, dim)
+        Returns: (query_ids, seg_ids) candidate pairs
+        """
+        queries = np.asarray(queries, dtype=float)
+        upper = self._greedy_bound(queries)
+        q = np.arange(len(queries))
+        nodes = np.zeros(len(queries), dtype=np.intp)
+        for level in range(len(self.levels) - 1, -1, -1):
+            if level < len(self.levels) - 1:
+                # Descend: every surviving node is replaced by its (existing) children.
+                q = np.repeat(q, 2)
+                nodes = (nodes[:, None] * 2 + np.arange(2)).ravel()
+                exists = nodes < len(self.levels[level])
+                q, nodes = q[exists], nodes[exists]
+            boxes = self.levels[level][nodes]
+            np.minimum.at(upper, q, _box_minmax_distance_sq(queries[q], boxes))
+            keep = _box_distance_sq(queries[q], boxes) <= upper[q]
+            q, nodes = q[keep], nodes[keep]
+        return q, nodes
+
+    def _greedy_bound(self, queries):
+        """
+        Squared distance from each query to a coarse grid on the leaf reached by always
+        descending into the nearer child: a cheap, usually tight, upper bound.
+        """
+        nodes = np.zeros(len(queries), dtype=np.intp)
+        for level in range(len(self.levels) - 2, -1, -1):
+            boxes = self.levels[level]
+            left = np.minimum(2 * nodes, len(boxes) - 1)
+            right = np.minimum(2 * nodes + 1, len(boxes) - 1)
+            nearer = _box_distance_sq(queries, boxes[right]) < _box_distance_sq(queries, boxes[left])
+            nodes = np.where(nearer, right, left)
+        grid = self.coefficients[nodes] @ _GRID_BASIS.T
+        return np.sum((grid - queries[:, :, None]) ** 2, axis=1).min(axis=1)
+
+    @instrumented("spatial.closest_point", points=lambda result: len(result[1]))
+    def closest_point(self, queries, iterations=8, chunk_size=65536):
+        """
+        Project points onto the curve.
+        :param queries: array of shape (Q, dim)
+        Returns: (seg_ids, t, points, distances) of the closest curve point to each query
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        seg_ids = np.empty(len(queries), dtype=np.intp)
+        t = np.empty(len(queries))
+        for start in range(0, len(queries), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            seg_ids[chunk], t[chunk] = self._closest_chunk(queries[chunk], iterations)
+        points = horner(self.coefficients, t, index=seg_ids)
+        return seg_ids, t, points, np.linalg.norm(points - queries, axis=-1)
+
+    def _closest_chunk(self, queries, iterations):
+        q, segs = self.candidates(queries)
+        p = queries[q]
+
+        # Seed every local minimum of the distance on a coarse grid, so that a segment
+        # passing near the query more than once is refined in each basin.
+        grid = self.coefficients[segs] @ _GRID_BASIS.T
+        coarse = np.sum((grid - p[:, :, None]) ** 2, axis=1)
+        padded = np.pad(coarse, ((0, 0), (1, 1)), constant_values=np.inf)
+        pair, cell = np.nonzero((coarse <= padded[:, :-2]) & (coarse <= padded[:, 2:]))
+        q, segs, p = q[pair], segs[pair], p[pair]
+        t = _GRID[cell]
+        # The minimum of a grid-local minimum's basin lies within one grid step of it.
+        lo = np.maximum(t - _GRID[1], 0.0)
+        hi = np.minimum(t + _GRID[1], 1.0)
+
+        # Newton iterations on (x(t) - p) . x'(t) = 0, clamped to the seed's bracket.
+        stack = derivative_stack(self.coefficients, (0, 1, 2))
+        for _ in range(iterations):
+            x, v, a = np.moveaxis(horner(stack, t[:, None], index=segs), 1, 0)
+            diff = x - p
+            g = np.sum(diff * v, axis=-1)
+            speed_sq = np.sum(v * v, axis=-1)
+            dg = speed_sq + np.sum(diff * a, axis=-1)
+            # Away from a minimum fall back to a Gauss-Newton step, and never leave the seed's bracket.
+            dg = np.where(dg > 0, dg, speed_sq)
+            step = np.divide(g, dg, out=np.zeros_like(g), where=dg > 0)
+            t = np.clip(t - step, lo, hi)
+
+        # Keep the best candidate of each query.
+        dist = np.sum((horner(self.coefficients, t, index=segs) - p) ** 2, axis=-1)
+        order = np.lexsort((dist, q))
+        first = np.concatenate([[True], q[order][1:] != q[order][:-1]])
+        best = order[first]
+        return segs[best], t[best]
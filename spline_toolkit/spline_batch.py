@@ -0,0 +1,185 @@
+import numpy as np
+from spline_toolkit import QuinticHermiteSpline
+from spline_toolkit.arc_length import ArcLengthTable
+from spline_toolkit.parallel import get_executor
+from spline_toolkit.polynomial import derivative_coefficients, derivative_stack, horner
+from spline_toolkit.quintic_hermite_segment import knot_coefficients
+from spline_toolkit.sampling import curvature_weighted_sample
+
+
+class SplineBatch:
+    """
+    A batch of B quintic Hermite splines sharing the same number of knots and dimension.
+
+    Knots are stored as one (B, n_knots, 3, dim) array and coefficients as one
+    (B, n_segments, dim, 6) array, so that parameter sweeps over thousands of design
+    variants are built, evaluated and sampled without creating per-spline objects.
+    """
+    def __init__(self, knots):
+        """
+        :param knots: array of shape (B, n_knots, 3, dim) with [point, tangent, curvature] rows
+        """
+        knots = np.ascontiguousarray(knots, dtype=float)
+        if knots.ndim != 4 or knots.shape[1] < 2 or knots.shape[2] != 3:
+            raise ValueError("knots must have shape (B, n_knots, 3, dim) with at least two knots.")
+        self._knots = knots
+        self.dim = knots.shape[-1]
+        self._coefficients = knot_coefficients(knots)
+        self._arc_table = None
+
+    @classmethod
+    def from_controls(cls, points, tangents, curvatures):
+        """
+        Build a batch from stacked control arrays, each of shape (B, n_knots, dim).
+        """
+        points = np.asarray(points, dtype=float)
+        tangents = np.asarray(tangents, dtype=float)
+        curvatures = np.asarray(curvatures, dtype=float)
+        if not (points.shape == tangents.shape == curvatures.shape) or points.ndim != 3:
+            raise ValueError("points, tangents, and curvatures must all have shape (B, n_knots, dim).")
+        return cls(np.stack([points, tangents, curvatures], axis=2))
+
+    @classmethod
+    def from_splines(cls, splines):
+        """
+        Stack splines with the same number of segments and dimension into a batch.
+        """
+        splines = list(splines)
+        if len(splines) < 1:
+            raise ValueError("At least one spline must be provided.")
+        shape = splines[0].knots.shape
+        if any(spline.knots.shape != shape for spline in splines):
+            raise ValueError("All splines must have the same number of segments and dimension.")
+        return cls(np.stack([spline.knots for spline in splines]))
+
+    def __len__(self):
+        return len(self._knots)
+
+    def __getitem__(self, i):
+        """
+        Return spline i as a standalone QuinticHermiteSpline.
+        """
+        knots = self._knots[i]
+        return QuinticHermiteSpline.from_controls(knots[:, 0], knots[:, 1], knots[:, 2])
+
+    @property
+    def n_segments(self):
+        return self._coefficients.shape[1]
+
+    @property
+    def knots(self):
+        """
+        Read-only knot data of shape (B, n_knots, 3, dim).
+        """
+        knots = self._knots.view()
+        knots.flags.writeable = False
+        return knots
+
+    @property
+    def coefficients(self):
+        """
+        Read-only coefficient tensor of shape (B, n_segments, dim, 6).
+        """
+        coefficients = self._coefficients.view()
+        coefficients.flags.writeable = False
+        return coefficients
+
+    def _evaluate(self, coefficients, s):
+        """
+        Evaluate per-segment polynomials of shape (B, n_segments, dim, m) at shared global parameters s.
+        """
+        s = np.asarray(s, dtype=float)
+        breaks = np.arange(self.n_segments + 1, dtype=float)
+        idx = np.clip(np.searchsorted(breaks, s, side='right') - 1, 0, self.n_segments - 1)
+        t = s - breaks[idx]
+        # Index segments along the leading axis, keeping the batch axis inside the evaluation.
+        by_segment = np.moveaxis(coefficients, 1, 0)
+        values = horner(by_segment, t.reshape(t.shape + (1,) * (by_segment.ndim - 3)), index=idx)
+        return np.moveaxis(values, t.ndim, 0)
+
+    def evaluate(self, s, workers=None):
+        """
+        Evaluate every spline at the global parameters s in [0, n_segments].
+        :param workers: evaluate on a pool of this many processes; inside a `parallel`
+                        block the block's pool is used by default
+        Returns: array of shape (B,) + s.shape + (dim,)
+        """
+        executor = get_executor(workers)
+        if executor is None:
+            return self._evaluate(self._coefficients, s)
+        s = np.asarray(s, dtype=float)
+        idx = np.clip(np.floor(s).astype(np.intp), 0, self.n_segments - 1).ravel()
+        # Address the flattened (B * n_segments) coefficients, spline by spline.
+        seg_ids = (np.arange(len(self))[:, None] * self.n_segments + idx).ravel()
+        t = np.tile(s.ravel() - idx, len(self))
+        points = executor.evaluate(self._coefficients.reshape(-1, self.dim, 6), seg_ids, t)
+        return points.reshape((len(self),) + s.shape + (self.dim,))
+
+    def derivative(self, s, order=1):
+        """
+        Evaluate the order-th derivative (1 to 5) of every spline at global parameters s.
+        """
+        if not 1 <= order <= 5:
+            raise ValueError("order must be between 1 and 5.")
+        return self._evaluate(derivative_coefficients(self._coefficients, order), s)
+
+    def evaluate_all(self, s):
+        """
+        Evaluate position, velocity and acceleration of every spline in a single Horner pass.
+        """
+        values = self._evaluate(derivative_stack(self._coefficients, (0, 1, 2)), s)
+        return values[..., 0, :], values[..., 1, :], values[..., 2, :]
+
+    def sample(self, points_per_segment=100, workers=None):
+        """
+        Sample every spline with a fixed number of curvature-weighted points per segment,
+        as QuinticHermiteSpline.sample() does by default.
+        :param workers: sample on a pool of this many processes; inside a `parallel`
+                        block the block's pool is used by default
+        Returns: array of shape (B, n_segments * points_per_segment, dim)
+        """
+        flat = self._coefficients.reshape(-1, self.dim, 6)
+        executor = get_executor(workers)
+        if executor is not None:
+            points = executor.sample(flat, points_per_segment)
+        else:
+            points = curvature_weighted_sample(flat, points_per_segment)
+        return points.reshape(len(self), self.n_segments * points_per_segment, self.dim)
+
+    def _arc_length_table(self):
+        if self._arc_table is None:
+            self._arc_table = ArcLengthTable(self._coefficients.reshape(-1, self.dim, 6))
+        return self._arc_table
+
+    def length(self):
+        """
+        Total arc length of every spline.
+        Returns: array of shape (B,)
+        """
+        return self._arc_length_table().segment_lengths.reshape(len(self), self.n_segments).sum(axis=1)
+
+    def param_at_length(self, lengths):
+        """
+        Global parameters at which each spline reaches the given arc lengths.
+        :param lengths: array of shape (B, Q), or (Q,) or a scalar shared by all splines
+        Returns: array of shape (B, Q), with Q = 1 for a scalar
+        """
+        table = self._arc_length_table()
+        lengths = np.atleast_1d(np.asarray(lengths, dtype=float))
+        if lengths.ndim > 2:
+            raise ValueError("lengths must be a scalar or have shape (Q,) or (B, Q).")
+        lengths = np.broadcast_to(lengths, (len(self),) + lengths.shape[-1:])
+        first = (np.arange(len(self)) * self.n_segments)[:, None]
+        idx, t = table.locate(table.offsets[first] + lengths, first=first, last=first + self.n_segments - 1)
+        return idx - first + t
+
+    def sample_uniform_arclength(self, n_points=100):
+        """
+        Sample n_points evenly spaced in arc length along every spline.
+        Returns: array of shape (B, n_points, dim)
+        """
+        lengths = self.length()[:, None] * np.linspace(0, 1, n_points)
+        s = self.param_at_length(lengths)
+        idx = np.clip(np.floor(s).astype(np.intp), 0, self.n_segments - 1)
+        batch = np.arange(len(self))[:, None]
+        return horner(self._coefficients[batch, idx], s - idx)